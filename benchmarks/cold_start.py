@@ -0,0 +1,127 @@
+"""Cold-start benchmark: import cost of the utils modules and first render of every page.
+
+Each measurement runs in a fresh interpreter so nothing is already imported or cached.
+
+    python benchmarks/cold_start.py [--repeat 5] [--output cold_start.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = [
+    "utils.auth_utils",
+    "utils.db",
+    "utils.expense_utils",
+    "utils.charts",
+    "utils.gemini_client",
+    "utils.pdf_generator",
+    "utils.season",
+    "utils.theme",
+]
+PAGES = [
+    "pages/1_Planner.py",
+    "pages/2_Expense_Tracker.py",
+    "pages/3_Recommendations.py",
+    "pages/4_Translator.py",
+    "pages/5_Safety.py",
+    "pages/6_Packing_Assistant.py",
+    "pages/7_Flight_Booking.py",
+    "pages/8_Hotel_Booking.py",
+]
+HEAVY_MODULES = ["google.generativeai", "pandas", "matplotlib", "fpdf"]
+
+# ──────────────── Child Processes ──────────────── #
+
+def _child_import(module):
+    import streamlit  # noqa: F401  (every page pays for this anyway; keep it out of the number)
+
+    start = time.perf_counter()
+    __import__(module)
+    elapsed = time.perf_counter() - start
+    return {"seconds": elapsed, "loaded": [name for name in HEAVY_MODULES if name in sys.modules]}
+
+def _child_page(page):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file("main.py", default_timeout=120)
+    start = time.perf_counter()
+    at.run()
+    login_seconds = time.perf_counter() - start
+
+    # Pages link to each other with st.page_link, which AppTest only resolves after main.py ran.
+    at.session_state["authentication_status"] = True
+    at.session_state["username"] = "bench@example.com"
+    at.session_state["name"] = "Bench"
+    start = time.perf_counter()
+    at.switch_page(page).run()
+    page_seconds = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(f"{page} raised: {at.exception[0].message}")
+    return {
+        "login_seconds": login_seconds,
+        "seconds": page_seconds,
+        "loaded": [name for name in HEAVY_MODULES if name in sys.modules],
+    }
+
+def _spawn(kind, target, data_dir):
+    env = dict(os.environ, SMARTTRAVEL_DATA_DIR=data_dir, PYTHONPATH=ROOT)
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", kind, target],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+# ──────────────── Runner ──────────────── #
+
+def _summarize(samples):
+    seconds = [sample["seconds"] for sample in samples]
+    return {
+        "median_ms": round(statistics.median(seconds) * 1000, 1),
+        "min_ms": round(min(seconds) * 1000, 1),
+        "loaded": samples[-1]["loaded"],
+    }
+
+def run(repeat):
+    results = {"python": sys.version.split()[0], "repeat": repeat, "imports": {}, "pages": {}}
+    with tempfile.TemporaryDirectory() as data_dir:
+        for module in MODULES:
+            results["imports"][module] = _summarize([_spawn("import", module, data_dir) for _ in range(repeat)])
+            print(f"import {module:<24} {results['imports'][module]['median_ms']:>8} ms", file=sys.stderr)
+
+        login = []
+        for page in PAGES:
+            samples = [_spawn("page", page, data_dir) for _ in range(repeat)]
+            login.extend(sample["login_seconds"] for sample in samples)
+            results["pages"][page] = _summarize(samples)
+            print(f"first render {page:<30} {results['pages'][page]['median_ms']:>8} ms", file=sys.stderr)
+        results["login_page_median_ms"] = round(statistics.median(login) * 1000, 1)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="write the JSON results here instead of stdout")
+    parser.add_argument("--child", nargs=2, metavar=("KIND", "TARGET"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        kind, target = args.child
+        print(json.dumps(_child_import(target) if kind == "import" else _child_page(target)))
+        return
+
+    results = run(args.repeat)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
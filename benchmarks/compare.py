@@ -0,0 +1,48 @@
+"""Compare two benchmark result files and flag regressions.
+
+    python -m benchmarks.compare baseline.json current.json [--threshold 0.2]
+
+Exits with status 1 when any benchmark's median got slower by more than the threshold.
+"""
+import argparse
+import json
+import sys
+
+def _index(report):
+    return {(r["name"], r.get("scale"), r.get("days")): r for r in report["results"]}
+
+def compare(baseline, current, threshold):
+    old, new = _index(baseline), _index(current)
+    regressions = []
+    for key in sorted(new, key=lambda k: (k[0], k[1] or 0, k[2] or 0)):
+        if key not in old or not old[key]["p50_ms"]:
+            continue
+        ratio = new[key]["p50_ms"] / old[key]["p50_ms"]
+        flag = "REGRESSION" if ratio > 1 + threshold else ""
+        name, scale, days = key
+        label = name + (f" @{scale}" if scale else "") + (f" ({days}d)" if days else "")
+        print(f"{label:<52} {old[key]['p50_ms']:>10.2f} -> {new[key]['p50_ms']:>10.2f} ms  x{ratio:5.2f} {flag}")
+        if flag:
+            regressions.append(label)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown, as a fraction (default 0.2)")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    print(f"baseline {baseline.get('commit')}  current {current.get('commit')}")
+    regressions = compare(baseline, current, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} regression(s) over {args.threshold:.0%}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Headless load driver: many concurrent sessions click through all eight pages offline.
+
+    python -m benchmarks.load --sessions 32 --concurrency 8 --latency-ms 800 [--output load.json]
+
+Each session logs in, then for every page renders it and triggers its main action
+(plan a trip, add an expense, find flights, ...). The model is the fake backend
+(SMARTTRAVEL_LLM_BACKEND=fake), so no key or quota is needed. Sessions run in a pool of
+worker processes because Streamlit's AppTest is not safe to drive from several threads.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (page, widget values to fill in, button that runs the page's model call or write)
+SCENARIO = [
+    ("pages/1_Planner.py", {"Destination": "Kyoto"}, "Generate Travel Plan"),
+    ("pages/2_Expense_Tracker.py", {"Amount": 1250.0}, "Add Expense"),
+    ("pages/3_Recommendations.py", {"Where are you now?": "Kyoto"}, "Give Me Ideas!"),
+    ("pages/4_Translator.py", {"Type your message in English:": "Where is the nearest train station?"}, "Translate & Chat"),
+    ("pages/5_Safety.py", {"Enter your travel destination": "Kyoto"}, "Get Safety Info"),
+    ("pages/6_Packing_Assistant.py", {"Where are you traveling to?": "Kyoto"}, "Generate Packing List"),
+    ("pages/7_Flight_Booking.py", {"To (destination city)": "Kyoto"}, "Find Flights"),
+    ("pages/8_Hotel_Booking.py", {"Destination City": "Kyoto"}, "Find Hotels"),
+]
+
+# ──────────────── Worker ──────────────── #
+
+def _widget(at, label):
+    for kind in (at.text_input, at.text_area, at.number_input):
+        for widget in kind:
+            if widget.label == label:
+                return widget
+    return None
+
+def _timed(samples, key, at, step):
+    start = time.perf_counter()
+    step()
+    samples.append((key, time.perf_counter() - start, [e.message for e in at.exception]))
+
+def run_session(session_id):
+    from streamlit.testing.v1 import AppTest
+
+    warnings.filterwarnings("ignore")
+    samples = []
+    at = AppTest.from_file(os.path.join(ROOT, "main.py"), default_timeout=300)
+    _timed(samples, "main.py login", at, at.run)
+    at.session_state["authentication_status"] = True
+    at.session_state["username"] = f"load{session_id:05d}@bench.example"
+    at.session_state["name"] = f"Load {session_id}"
+
+    for page, inputs, button in SCENARIO:
+        _timed(samples, f"{page} render", at, lambda: at.switch_page(page).run())
+        for label, value in inputs.items():
+            widget = _widget(at, label)
+            if widget is not None:
+                widget.set_value(value)
+        target = next((b for b in at.button if b.label == button), None)
+        if target is None:
+            samples.append((f"{page} {button}", None, [f"button {button!r} not rendered"]))
+            continue
+        _timed(samples, f"{page} {button}", at, lambda: target.click().run())
+    return samples
+
+def _init_worker(env):
+    os.environ.update(env)
+    os.chdir(ROOT)
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+
+# ──────────────── Report ──────────────── #
+
+def _percentile(sorted_samples, pct):
+    return sorted_samples[min(len(sorted_samples) - 1, int(len(sorted_samples) * pct / 100))]
+
+def summarize(samples):
+    by_step, errors = {}, {}
+    for key, seconds, step_errors in samples:
+        if seconds is not None:
+            by_step.setdefault(key, []).append(seconds)
+        for error in step_errors:
+            errors[f"{key}: {error}"] = errors.get(f"{key}: {error}", 0) + 1
+
+    def stats(values):
+        values = sorted(values)
+        return {
+            "count": len(values),
+            "mean_ms": round(statistics.fmean(values) * 1000, 1),
+            "p50_ms": round(_percentile(values, 50) * 1000, 1),
+            "p95_ms": round(_percentile(values, 95) * 1000, 1),
+            "p99_ms": round(_percentile(values, 99) * 1000, 1),
+            "max_ms": round(values[-1] * 1000, 1),
+        }
+
+    every = [seconds for values in by_step.values() for seconds in values]
+    return {
+        "overall": stats(every) if every else None,
+        "steps": {key: stats(values) for key, values in sorted(by_step.items())},
+        "errors": errors,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=16)
+    parser.add_argument("--concurrency", type=int, default=4, help="worker processes driving sessions at once")
+    parser.add_argument("--latency-ms", type=float, default=800, help="fake model time to first chunk")
+    parser.add_argument("--jitter", type=float, default=0.3, help="latency spread, as a fraction")
+    parser.add_argument("--chunk-ms", type=float, default=30, help="fake model delay between streamed chunks")
+    parser.add_argument("--size-factor", type=float, default=1.0, help="scales fake response length")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="smarttravel-load-") as data_dir:
+        env = {
+            "SMARTTRAVEL_DATA_DIR": data_dir,
+            "SMARTTRAVEL_LLM_BACKEND": "fake",
+            "SMARTTRAVEL_FAKE_LATENCY_MS": str(args.latency_ms),
+            "SMARTTRAVEL_FAKE_JITTER": str(args.jitter),
+            "SMARTTRAVEL_FAKE_CHUNK_MS": str(args.chunk_ms),
+            "SMARTTRAVEL_FAKE_SIZE_FACTOR": str(args.size_factor),
+        }
+        # Hand the pool the functions under their importable name: AppTest swaps __main__
+        # for main.py inside the workers, so __main__.run_session can't be unpickled there.
+        from benchmarks import load
+
+        started = time.perf_counter()
+        with multiprocessing.get_context("spawn").Pool(args.concurrency, initializer=load._init_worker, initargs=(env,)) as pool:
+            samples = [sample for session in pool.imap_unordered(load.run_session, range(args.sessions)) for sample in session]
+        elapsed = time.perf_counter() - started
+
+    report = {
+        "sessions": args.sessions,
+        "concurrency": args.concurrency,
+        "fake_model": {"latency_ms": args.latency_ms, "jitter": args.jitter, "chunk_ms": args.chunk_ms, "size_factor": args.size_factor},
+        "wall_seconds": round(elapsed, 2),
+        "steps_per_second": round(len(samples) / elapsed, 2),
+        **summarize(samples),
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
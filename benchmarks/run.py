@@ -0,0 +1,78 @@
+"""Run the storage, auth, PDF and model-client benchmarks against a scratch data directory.
+
+    python -m benchmarks.run [--scales 100,1000,10000] [--only trips,pdf] [--output results.json]
+
+Results are JSON (one record per benchmark and scale); compare two runs with
+python -m benchmarks.compare.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+DEFAULT_SCALES = "100,1000,10000"
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(scales, only=None):
+    from benchmarks import suite
+
+    results = []
+    for name, bench in suite.SCALED.items():
+        if only and name not in only:
+            continue
+        for scale in scales:
+            if scale > suite.MAX_SCALE_ROWS:
+                continue
+            started = time.perf_counter()
+            records = bench(scale)
+            results.extend(records)
+            print(f"{name:<10} scale={scale:<8} {len(records)} results in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    for name, bench in suite.UNSCALED.items():
+        if only and name not in only:
+            continue
+        started = time.perf_counter()
+        records = bench()
+        results.extend(records)
+        print(f"{name:<10} {len(records)} results in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", default=DEFAULT_SCALES, help="comma-separated store sizes, up to 1000000")
+    parser.add_argument("--only", help="comma-separated subset: trips, expenses, bookings, auth, pdf, gemini")
+    parser.add_argument("--output", help="write the JSON results here instead of stdout")
+    parser.add_argument("--data-dir", help="scratch data directory (default: a temporary directory)")
+    args = parser.parse_args()
+
+    scales = [int(scale) for scale in args.scales.split(",")]
+    only = set(args.only.split(",")) if args.only else None
+
+    with tempfile.TemporaryDirectory(prefix="smarttravel-bench-") as scratch:
+        # utils.storage reads the data directory at import time, so set it before importing the suite.
+        os.environ["SMARTTRAVEL_DATA_DIR"] = args.data_dir or scratch
+        report = {
+            "commit": _git_commit(),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "scales": scales,
+            "results": run(scales, only),
+        }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
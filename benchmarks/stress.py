@@ -0,0 +1,138 @@
+"""Multi-process write stress: replicas sharing one data directory must not lose writes.
+
+    python -m benchmarks.stress --processes 8 --writes 50 [--output stress.json]
+
+Worker processes start together and each saves trips, expenses and bookings for one
+shared user, rewrites a shared profile with save_users, registers users of its own and
+races the others to register one shared email. Half the workers save identical trips,
+so itinerary blobs are deduplicated under contention too. Afterwards every write is
+checked for; the exit status is 1 if any is missing.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import traceback
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SHARED_USER = "shared@stress.example"
+SHARED_PROFILE = "profile@stress.example"
+SHARED_SIGNUP = "signup@stress.example"
+
+# ──────────────── Worker ──────────────── #
+
+def _workload(worker, writes):
+    from benchmarks import synthetic
+
+    return (
+        synthetic.trips(writes, seed=worker % 2, short=True),
+        synthetic.expenses(writes, seed=worker),
+        synthetic.bookings(writes, seed=worker),
+    )
+
+def run_worker(worker, writes, env, barrier, results):
+    os.environ.update(env)
+    os.chdir(ROOT)
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    try:
+        from utils import auth_utils, db, expense_utils
+
+        trips, expenses, bookings = _workload(worker, writes)
+        hashed = auth_utils._hash_password("Stress-password-1")
+        registered, trip_ids = [], []
+        barrier.wait()
+        for i in range(writes):
+            trip_ids.append(db.save_trip(SHARED_USER, dict(trips[i])))
+            expense_utils.save_expense(SHARED_USER, expenses[i])
+            db.save_booking(SHARED_USER, dict(bookings[i]))
+            auth_utils.save_users({SHARED_PROFILE: {"name": f"Worker {worker}", "password": hashed, "write": i}})
+            email = f"w{worker}-{i}@stress.example"
+            if auth_utils.register_user(email, "Stress-password-1", f"Worker {worker}"):
+                registered.append(email)
+        won_signup = auth_utils.register_user(SHARED_SIGNUP, "Stress-password-1", f"Worker {worker}")
+        results.put({"worker": worker, "trip_ids": trip_ids, "registered": registered, "won_signup": won_signup})
+    except Exception:
+        results.put({"worker": worker, "error": traceback.format_exc()})
+
+# ──────────────── Checks ──────────────── #
+
+def verify(processes, writes, reports):
+    from utils import auth_utils, db, expense_utils
+
+    expected = processes * writes
+    saved_ids = [trip_id for report in reports for trip_id in report["trip_ids"]]
+    stored_ids = [trip["id"] for trip in db.load_trips(SHARED_USER)]
+    amount = round(sum(float(e["amount"]) for w in range(processes) for e in _workload(w, writes)[1]), 2)
+    totals = expense_utils.load_expense_totals(SHARED_USER)
+    profile = auth_utils.load_user(SHARED_PROFILE) or {}
+    registered = [email for report in reports for email in report["registered"]]
+
+    checks = {
+        "trips.saved": (expected, len(set(saved_ids))),
+        "trips.stored": (expected, len(set(saved_ids) & set(stored_ids))),
+        "trips.searchable": (expected, db.count_trips(SHARED_USER, "day")),
+        "expenses.rows": (expected, len(expense_utils.load_expense_frame(SHARED_USER))),
+        "expenses.total": (amount, round(float(expense_utils.load_expense_frame(SHARED_USER)["amount"].sum()), 2)),
+        "expenses.totals_count": (expected, totals["count"]),
+        "expenses.totals_total": (amount, round(totals["total"], 2)),
+        "bookings.stored": (expected, len(db.load_bookings(SHARED_USER))),
+        "users.registered": (expected, sum(1 for email in registered if auth_utils.load_user(email))),
+        "users.shared_signup_winners": (1, sum(1 for report in reports if report["won_signup"])),
+        "users.shared_profile_last_write": (writes - 1, profile.get("write")),
+    }
+    return {name: {"expected": want, "actual": got, "ok": want == got} for name, (want, got) in checks.items()}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--writes", type=int, default=50, help="writes of each kind per process")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="smarttravel-stress-") as data_dir:
+        env = {"SMARTTRAVEL_DATA_DIR": data_dir, "SMARTTRAVEL_BCRYPT_ROUNDS": "4"}
+        os.environ.update(env)
+        # Workers are started by importable name, as in benchmarks.load.
+        from benchmarks import stress
+
+        ctx = multiprocessing.get_context("spawn")
+        barrier, results = ctx.Barrier(args.processes), ctx.Queue()
+        workers = [
+            ctx.Process(target=stress.run_worker, args=(worker, args.writes, env, barrier, results))
+            for worker in range(args.processes)
+        ]
+        started = time.perf_counter()
+        for process in workers:
+            process.start()
+        reports = [results.get() for _ in workers]
+        for process in workers:
+            process.join()
+        elapsed = time.perf_counter() - started
+
+        errors = [report["error"] for report in reports if "error" in report]
+        checks = {} if errors else verify(args.processes, args.writes, reports)
+
+    # Each write round is a trip, an expense, a booking, a profile rewrite and a signup.
+    report = {
+        "processes": args.processes,
+        "writes_per_process": args.writes,
+        "wall_seconds": round(elapsed, 2),
+        "writes_per_second": round(args.processes * args.writes * 5 / elapsed, 1),
+        "errors": errors,
+        "checks": checks,
+        "ok": not errors and all(check["ok"] for check in checks.values()),
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    sys.exit(0 if report["ok"] else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""Hot-path benchmarks. Import only after SMARTTRAVEL_DATA_DIR points at a scratch directory."""
+import itertools
+import statistics
+import time
+from datetime import timedelta
+from benchmarks import synthetic
+from utils import auth_utils, db, expense_utils, gemini_client, pdf_generator
+from utils.storage import atomic_write_bytes, atomic_write_json
+
+# Per-benchmark ceilings: beyond these the seeding alone takes minutes or tens of GB.
+MAX_SCALE_USERS = 100_000
+MAX_SCALE_ROWS = 1_000_000
+
+_unique = itertools.count()
+
+# ──────────────── Timing ──────────────── #
+
+def measure(name, fn, iterations, scale=None, **extra):
+    samples = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    result = {
+        "name": name,
+        "scale": scale,
+        "iterations": iterations,
+        "mean_ms": round(statistics.fmean(samples) * 1000, 3),
+        "p50_ms": round(samples[len(samples) // 2] * 1000, 3),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 3),
+        "min_ms": round(samples[0] * 1000, 3),
+        "max_ms": round(samples[-1] * 1000, 3),
+    }
+    result.update(extra)
+    return result
+
+def iterations_for(scale, budget=100_000, low=3, high=50):
+    # Bigger stores get fewer repetitions so every benchmark finishes in seconds.
+    return max(low, min(high, budget // max(scale, 1)))
+
+# ──────────────── Seeding ──────────────── #
+
+def seed_trips(user_email, n):
+    db._import_trips({user_email: synthetic.trips(n, seed=n, short=True)})
+
+def seed_expenses(user_email, n):
+    df = expense_utils._to_frame(synthetic.expenses(n, seed=n))
+    atomic_write_bytes(expense_utils._rows_path(user_email, create_dir=True), expense_utils._frame_bytes(df))
+    atomic_write_json(expense_utils._totals_path(user_email), expense_utils._totals_from_frame(df))
+    return df
+
+def seed_bookings(user_email, n):
+    db._import_bookings({user_email: synthetic.bookings(n, seed=n)})
+
+def seed_users(n, password):
+    hashed = auth_utils._hash_password(password)
+    auth_utils.save_users({synthetic.email(i, f"auth{n}-"): {"name": f"User {i}", "password": hashed} for i in range(n)})
+
+# ──────────────── Storage ──────────────── #
+
+def bench_trips(scale):
+    user = synthetic.email(scale, "trips")
+    seed_trips(user, scale)
+    new_trips = synthetic.trips(50, seed=-scale)
+    save = measure("db.save_trip", lambda i: db.save_trip(user, new_trips[i]), 50, scale)
+    load = measure("db.load_trips", lambda i: db.load_trips(user), iterations_for(scale), scale)
+    words = ["kyoto", "temple", "boat", "market walk", "cooking class", "goa"]
+    search = measure("db.search_trips", lambda i: db.search_trips(user, words[i % len(words)], limit=20), 30, scale)
+    facets = measure("db.trip_facets", lambda i: db.trip_facets(user, words[i % len(words)]), 30, scale)
+    page = measure("db.load_trips.page", lambda i: db.load_trips(user, offset=(i * 10) % scale, limit=10, newest_first=True), 30, scale)
+    summaries = measure("db.load_trip_summaries", lambda i: db.load_trip_summaries(user, limit=5), 30, scale)
+    count = measure("db.count_trips", lambda i: db.count_trips(user), 30, scale)
+    ids = [trip["id"] for trip in db.load_trip_summaries(user, limit=50)]
+    favorite = measure("db.mark_favorite", lambda i: db.mark_favorite(user, ids[i], i % 2 == 0), 50, scale)
+    update = measure("db.update_trip", lambda i: db.update_trip(user, ids[i], {"days": 5, "itinerary": f"Revised plan {i}"}), 30, scale)
+    delete = measure("db.delete_trip", lambda i: db.delete_trip(user, ids[i]), 30, scale)
+    return [save, load, page, summaries, count, search, facets, favorite, update, delete]
+
+def bench_expenses(scale):
+    user = synthetic.email(scale, "expenses")
+    seed_expenses(user, scale)
+    new_rows = synthetic.expenses(50, seed=-scale)
+    results = [
+        measure("expense_utils.save_expense", lambda i: expense_utils.save_expense(user, new_rows[i]),
+                iterations_for(scale, budget=200_000, high=20), scale),
+    ]
+
+    def cold_frame(i):
+        expense_utils._frame_cache.clear()
+        expense_utils.load_expense_frame(user)
+
+    results.append(measure("expense_utils.load_expense_frame.cold", cold_frame, iterations_for(scale), scale))
+    results.append(measure("expense_utils.load_expense_frame.warm", lambda i: expense_utils.load_expense_frame(user), 50, scale))
+    results.append(measure("expense_utils.load_expenses", lambda i: expense_utils.load_expenses(user), iterations_for(scale), scale))
+
+    def pipeline(i):
+        # What the expense page does on every rerun with a trip filter applied.
+        totals = expense_utils.load_expense_totals(user)
+        trip = sorted(totals["by_trip"])[i % len(totals["by_trip"])]
+        df = expense_utils.load_expense_frame(user)
+        filtered = df[df["trip"] == trip]
+        expense_utils.category_totals(totals, trip=trip)
+        filtered.sort_values(by="date", ascending=False)
+        filtered.to_csv(index=False)
+
+    results.append(measure("expenses.page_pipeline", pipeline, iterations_for(scale), scale))
+    return results
+
+def bench_bookings(scale):
+    user = synthetic.email(scale, "bookings")
+    seed_bookings(user, scale)
+    new_bookings = synthetic.bookings(50, seed=-scale)
+    r = synthetic.rng(-scale)
+    starts = [synthetic.START + timedelta(days=r.randrange(730)) for _ in range(50)]
+    windows = [(start, start + timedelta(days=7)) for start in starts]
+    return [
+        measure("db.save_booking", lambda i: db.save_booking(user, new_bookings[i]), 50, scale),
+        measure("db.upcoming_bookings", lambda i: db.upcoming_bookings(user, today=windows[i][0]), 50, scale),
+        measure("db.upcoming_bookings.hotel", lambda i: db.upcoming_bookings(user, "hotel", today=windows[i][0]), 50, scale),
+        measure("db.bookings_between", lambda i: db.bookings_between(user, *windows[i], limit=20), 50, scale),
+        measure("db.bookings_between.all", lambda i: db.bookings_between(user, *windows[i]), iterations_for(scale), scale),
+    ]
+
+def bench_auth(scale):
+    if scale > MAX_SCALE_USERS:
+        return []
+    password = "Bench-password-1"
+    seed_users(scale, password)
+    emails = [synthetic.email(i, f"auth{scale}-") for i in synthetic.rng(scale).sample(range(scale), min(scale, 10))]
+
+    def login(i):
+        # A different user each time so the in-memory directory starts cold.
+        assert auth_utils.authenticate_user(emails[i], password)
+
+    return [measure("auth_utils.authenticate_user", login, len(emails), scale, bcrypt_rounds=auth_utils.BCRYPT_ROUNDS)]
+
+# ──────────────── Unscaled ──────────────── #
+
+def bench_pdf():
+    r = synthetic.rng("pdf")
+    trips = [dict(synthetic.trip(r), days=days, itinerary=synthetic.itinerary(r, days)) for days in (3, 7, 14)]
+    results = []
+    for trip in trips:
+        results.append(measure("pdf_generator.generate_pdf", lambda i: pdf_generator.generate_pdf(trip), 10,
+                               days=trip["days"], itinerary_bytes=len(trip["itinerary"].encode())))
+    pdf_generator.render_pdf_cached(trips[1])
+    results.append(measure("pdf_generator.render_pdf_cached.hit", lambda i: pdf_generator.render_pdf_cached(trips[1]), 50))
+    return results
+
+def bench_gemini():
+    gemini_client.use_backend("fake")
+    prompts = [f"Create a 5-day travel itinerary for Kyoto, request {next(_unique)}." for _ in range(50)]
+    results = [
+        measure("gemini_client.ask_gemini.uncached", lambda i: gemini_client.ask_gemini(prompts[i]), 50),
+        measure("gemini_client.ask_gemini.cache_miss", lambda i: gemini_client.ask_gemini(prompts[i], cache_ttl=60), 50),
+        measure("gemini_client.ask_gemini.cache_hit", lambda i: gemini_client.ask_gemini(prompts[i], cache_ttl=60), 50),
+    ]
+    batch = [f"Find flight options to Goa, batch {next(_unique)}-{i}" for i in range(8)]
+    results.append(measure("gemini_client.ask_gemini_many", lambda i: gemini_client.ask_gemini_many(batch), 20, batch=len(batch)))
+    return results
+
+SCALED = {"trips": bench_trips, "expenses": bench_expenses, "bookings": bench_bookings, "auth": bench_auth}
+UNSCALED = {"pdf": bench_pdf, "gemini": bench_gemini}
@@ -0,0 +1,76 @@
+"""Deterministic synthetic users, trips, expenses and bookings."""
+import random
+from datetime import date, timedelta
+from utils.fake_gemini import DESTINATIONS, itinerary, flight_record, hotel_record
+
+INTERESTS = ["beaches", "food", "history", "nightlife", "trekking", "museums", "shopping", "wildlife", "architecture"]
+CATEGORIES = ["Food", "Transport", "Accommodation", "Activities", "Misc"]
+START = date(2024, 1, 1)
+
+def rng(seed):
+    return random.Random(seed)
+
+def email(i, prefix="user"):
+    return f"{prefix}{i:07d}@bench.example"
+
+# ──────────────── Trips ──────────────── #
+
+def trip(r, short=False):
+    days = r.randint(2, 10)
+    return {
+        "destination": r.choice(DESTINATIONS),
+        "interests": ", ".join(r.sample(INTERESTS, 2)),
+        "days": days,
+        "start_date": str(START + timedelta(days=r.randrange(730))),
+        "budget_per_day": float(r.randrange(1500, 15000, 500)),
+        "favorite": r.random() < 0.1,
+        # Bulk rows keep a one-day itinerary so 10^6-row stores stay a manageable size.
+        "itinerary": itinerary(r, 1 if short else days),
+    }
+
+def trips(n, seed=0, short=False):
+    r = rng(seed)
+    return [trip(r, short=short) for _ in range(n)]
+
+# ──────────────── Expenses ──────────────── #
+
+def expense(r, trip_names):
+    return {
+        "trip": r.choice(trip_names),
+        "amount": round(r.uniform(50, 8000), 2),
+        "category": r.choice(CATEGORIES),
+        "notes": r.choice(["", "", "cash", "card", "shared with friends", "tip included"]),
+        "date": str(START + timedelta(days=r.randrange(730))),
+    }
+
+def expenses(n, seed=0, trip_count=20):
+    r = rng(seed)
+    trip_names = [f"{r.choice(DESTINATIONS)} {2024 + i % 2} #{i}" for i in range(trip_count)]
+    return [expense(r, trip_names) for _ in range(n)]
+
+# ──────────────── Bookings ──────────────── #
+
+def flight_booking(r):
+    departure = START + timedelta(days=r.randrange(730))
+    return {
+        "type": "flight",
+        "from": r.choice(DESTINATIONS),
+        "to": r.choice(DESTINATIONS),
+        "departure_date": str(departure),
+        "return_date": str(departure + timedelta(days=r.randint(2, 14))),
+        "listing": flight_record(r),
+    }
+
+def hotel_booking(r):
+    checkin = START + timedelta(days=r.randrange(730))
+    return {
+        "type": "hotel",
+        "destination": r.choice(DESTINATIONS),
+        "checkin_date": str(checkin),
+        "checkout_date": str(checkin + timedelta(days=r.randint(1, 10))),
+        "listing": hotel_record(r),
+    }
+
+def bookings(n, seed=0):
+    r = rng(seed)
+    return [flight_booking(r) if r.random() < 0.5 else hotel_booking(r) for _ in range(n)]
@@ -1,19 +1,25 @@
 import streamlit as st
 import re
 import os
-import json
-from PIL import Image
-from utils.auth_utils import register_user, authenticate_user
-import os
+from utils.auth_utils import register_user, authenticate_user, AuthBusyError
+from utils.session import start_session, end_session, end_all_sessions, check_session
+from utils.db import load_trip, load_trip_summaries, count_trips
+from utils.theme import apply_theme, hero_image
 os.environ["STREAMLIT_WATCHER_TYPE"] = "none"
 
 
 st.set_page_config(page_title="SmartTravel Assistant", layout="wide")
 
-# ──────────────── Hide Sidebar on Login Screen ──────────────── #
+HISTORY_PAGE_SIZE = 5
+
 if "authentication_status" not in st.session_state:
     st.session_state["authentication_status"] = False
 
+# ──────────────── Session Check ──────────────── #
+# Ends the session here too if its token expired or was revoked from another device.
+check_session()
+
+# ──────────────── Hide Sidebar on Login Screen ──────────────── #
 if not st.session_state["authentication_status"]:
     st.markdown("""
         <style>
@@ -28,154 +34,7 @@ if not st.session_state["authentication_status"]:
 
 # ──────────────── Custom Styling ──────────────── #
 
-st.markdown("""
-    <style>
-        :root {
-            color-scheme: light dark;
-        }
-
-        body {
-            background-color: var(--background-color, #111927);
-            color: var(--text-color, #fefefe);
-            font-family: 'Segoe UI', sans-serif;
-        }
-
-        @media (prefers-color-scheme: light) {
-            body {
-                --primary-color: #0fa3b1;
-                --text-color: #111927;
-                --background-color: #ffffff;
-                --card-bg: #f3f9fb;
-                --card-border: #0fa3b1;
-            }
-        }
-
-        @media (prefers-color-scheme: dark) {
-            body {
-                --primary-color: #00c6ff;
-                --text-color: #fefefe;
-                --background-color: #111927;
-                --card-bg: #1e2f4d;
-                --card-border: #00c6ff;
-            }
-        }
-
-        .block-container {
-            padding-top: 2rem;
-        }
-
-        .custom-header {
-            font-size: 42px;
-            font-weight: 900;
-            color: var(--primary-color);
-            margin-bottom: 0.2rem;
-            animation: fadeSlide 1.2s ease-in-out;
-        }
-
-        @keyframes fadeSlide {
-            0% { opacity: 0; transform: translateY(-20px); }
-            100% { opacity: 1; transform: translateY(0); }
-        }
-
-        .custom-subheader {
-            font-size: 20px;
-            font-weight: 400;
-            color: #a9b8c1;
-        }
-
-        .greeting-banner {
-            background: linear-gradient(to right, #e0f7fa, #e0f2f1);
-            padding: 24px;
-            border-radius: 14px;
-            margin-bottom: 24px;
-            color: #004d40;
-            box-shadow: 0 2px 12px rgba(0,0,0,0.1);
-        }
-
-        .greeting-banner h3 {
-            font-size: 26px;
-            font-weight: 700;
-        }
-
-        .greeting-banner p {
-            font-size: 16px;
-            margin: 0;
-        }
-
-        .card-wrapper {
-            height: 100%;
-            display: flex;
-            flex-direction: column;
-            justify-content: space-between;
-        }
-
-        .card {
-            background-color: var(--card-bg);
-            border-radius: 16px;
-            padding: 24px;
-            border: 1px solid var(--card-border);
-            box-shadow: 0 4px 12px rgba(0,0,0,0.3);
-            transition: all 0.3s ease;
-            height: 190px;
-        }
-
-        .card:hover {
-            transform: translateY(-6px);
-            box-shadow: 0 10px 22px rgba(0,0,0,0.5);
-        }
-
-        .card h4 {
-            color: var(--primary-color);
-            font-size: 20px;
-        }
-
-        .card p {
-            color: var(--text-color);
-            font-size: 15px;
-        }
-
-        .stButton button {
-            width: 100%;
-            background-color: var(--primary-color) !important;
-            color: white !important;
-            font-weight: 700 !important;
-            border-radius: 10px !important;
-            padding: 12px 0 !important;
-            margin-top: 8px;
-        }
-
-        .trip-history-box {
-            background-color: #ffffff;
-            border: 3px solid var(--primary-color);
-            border-radius: 12px;
-            padding: 18px;
-            margin-bottom: 14px;
-            box-shadow: 0 2px 8px rgba(0,0,0,0.15);
-        }
-
-        .trip-history-box div {
-            color: #1e2f4d;
-        }
-
-        .stPageLinkButton button {
-            width: 100%;
-            background-color: var(--primary-color) !important;
-            color: white !important;
-            font-weight: 700 !important;
-            border-radius: 10px !important;
-            padding: 10px 0 !important;
-            margin-top: 12px !important;
-            transition: background-color 0.3s ease, transform 0.2s ease;
-        }
-
-        .stPageLinkButton button:hover {
-            background-color: #009fcc !important;
-            transform: translateY(-3px);
-        }
-
-    </style>
-            
-""", unsafe_allow_html=True)
+apply_theme("dashboard.css")
 
 
 # ──────────────── Auth State ──────────────── #
@@ -191,7 +50,7 @@ name = st.session_state["name"]
 def show_logo_and_header():
     col1, col2 = st.columns([1, 6])
     with col1:
-        st.image("logo.png", width=140)
+        st.image(hero_image("logo.png", 280), width=140)
     with col2:
         st.markdown('<div class="custom-header">SmartTravel Assistant</div>', unsafe_allow_html=True)
         st.markdown('<div class="custom-subheader">Effortless trip planning with AI-powered insights.</div>', unsafe_allow_html=True)
@@ -208,16 +67,17 @@ if not auth_status:
 
         if st.button("Login"):
             login_email = login_email.strip().lower()
-            user_name = authenticate_user(login_email, login_pass)
-            if user_name:
-                st.session_state.update({
-                    "authentication_status": True,
-                    "username": login_email,
-                    "name": user_name,
-                })
-                st.rerun()
+            try:
+                user_name = authenticate_user(login_email, login_pass)
+            except AuthBusyError as e:
+                user_name = None
+                st.warning(str(e))
             else:
-                st.error("Invalid email or password.")
+                if user_name:
+                    start_session(login_email, user_name)
+                    st.rerun()
+                else:
+                    st.error("Invalid email or password.")
 
     with signup_tab:
         st.subheader("Create a New Account")
@@ -236,31 +96,34 @@ if not auth_status:
                 st.error("Passwords do not match.")
             elif len(new_pass) < 8 or not re.search(r"[A-Z]", new_pass) or not re.search(r"[a-z]", new_pass) or not re.search(r"\d", new_pass):
                 st.error("Password must be at least 8 characters with a number, lowercase and uppercase letter.")
-            elif register_user(new_email, new_pass, new_name):
-                st.success("Account created! Logging you in...")
-                st.session_state.update({
-                    "authentication_status": True,
-                    "username": new_email,
-                    "name": new_name,
-                })
-                st.rerun()
             else:
-                st.warning("An account with this email already exists.")
+                try:
+                    created = register_user(new_email, new_pass, new_name)
+                except AuthBusyError as e:
+                    st.warning(str(e))
+                else:
+                    if created:
+                        st.success("Account created! Logging you in...")
+                        start_session(new_email, new_name)
+                        st.rerun()
+                    else:
+                        st.warning("An account with this email already exists.")
 
 # ──────────────── Dashboard ──────────────── #
 if auth_status:
     st.sidebar.success(f"Logged in as {name}")
     if st.sidebar.button("Logout"):
-        st.session_state["authentication_status"] = False
-        st.session_state["username"] = None
-        st.session_state["name"] = None
+        end_session()
+        st.rerun()
+    if st.sidebar.button("Log Out Everywhere", help="Also signs out every other device and browser"):
+        end_all_sessions()
         st.rerun()
 
     show_logo_and_header()
     st.markdown("---")
     col1, col2, col3 = st.columns([1, 2, 1])  # Adjust the ratio as needed
     with col2:
-        st.image("travel.jpg", width=900)
+        st.image(hero_image("travel.png", 900), width=900)
 
     st.markdown("""
         <div class="greeting-banner">
@@ -306,17 +169,13 @@ if auth_status:
     st.markdown("### Your Travel History")
     st.markdown("View your previous planned trips and explore them again!")
 
-    trip_file_path = os.path.join("data", "trips.json")
-    try:
-        with open(trip_file_path, "r") as f:
-            trips_data = json.load(f)
-    except FileNotFoundError:
-        trips_data = {}
-
-    user_trips = trips_data.get(st.session_state["username"], [])
+    # Summaries only, a few at a time; an itinerary is fetched when it is opened.
+    history_limit = st.session_state.get("history-limit", HISTORY_PAGE_SIZE)
+    user_trips = load_trip_summaries(st.session_state["username"], limit=history_limit)
+    open_trip = st.session_state.get("history-open")
 
     if user_trips:
-        for trip in user_trips[::-1]:
+        for trip in user_trips:
             with st.container():
                 col1, col2 = st.columns([4, 1])
                 with col1:
@@ -334,9 +193,21 @@ if auth_status:
                         </div>
                     """, unsafe_allow_html=True)
                 with col2:
-                    if st.button("View Itinerary", key=f"{trip['destination']}_{trip['start_date']}"):
-                        st.session_state["selected_trip"] = trip
-                        st.switch_page("pages/Planner.py")
+                    is_open = open_trip == trip["id"]
+                    if st.button("Hide Itinerary" if is_open else "View Itinerary", key=f"history-{trip['id']}"):
+                        st.session_state["history-open"] = None if is_open else trip["id"]
+                        st.rerun()
+                if is_open:
+                    full_trip = load_trip(st.session_state["username"], trip["id"])
+                    if full_trip:
+                        st.session_state["selected_trip"] = full_trip
+                        st.markdown(full_trip["itinerary"] or "")
+
+        total_trips = count_trips(st.session_state["username"])
+        if total_trips > len(user_trips):
+            if st.button(f"Show More ({total_trips - len(user_trips)} older)"):
+                st.session_state["history-limit"] = history_limit + HISTORY_PAGE_SIZE
+                st.rerun()
     else:
         st.info("No past trips found. Start planning to see your history here!")
 
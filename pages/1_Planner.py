@@ -1,120 +1,27 @@
 import streamlit as st
 from datetime import date
 import base64
-import os
 import re
-from utils.gemini_client import ask_gemini
-from utils.db import save_trip, load_trips, clear_trips, mark_favorite
-from utils.pdf_generator import generate_pdf
+from utils.gemini_client import ask_gemini_stream, GeminiBusyError
+from utils.db import save_trip, load_trips, load_trip_summaries, clear_trips, delete_trip, mark_favorite, search_trips, trip_facets, count_trips, DURATION_BANDS, BUDGET_BANDS
+from utils.pdf_generator import render_pdf_cached, trip_digest, pdf_filename, generate_pdf_zip
+from utils.theme import apply_theme
+from utils.session import require_login
 
 st.set_page_config(page_title="SmartTravel Trip Planner", layout="wide")
 
+TRIPS_PER_PAGE = 10
 
-# ──────── Custom Styles ──────── #
-st.markdown("""
-    <style>
-        :root {
-            color-scheme: light dark;
-        }
-
-        body {
-            background-color: var(--background-color, #111927);
-            color: var(--text-color, #fefefe);
-            font-family: 'Segoe UI', sans-serif;
-        }
-
-        @media (prefers-color-scheme: light) {
-            body {
-                --primary-color: #0fa3b1;
-                --text-color: #111927;
-                --background-color: #ffffff;
-                --card-bg: #c6e8f4;
-                --card-border: #0fa3b1;
-            }
-        }
-
-        @media (prefers-color-scheme: dark) {
-            body {
-                --primary-color: #00c6ff;
-                --text-color: #fefefe;
-                --background-color: #111927;
-                --card-bg: #1e2f4d;
-                --card-border: #00c6ff;
-            }
-        }
-
-        .header-main {
-            font-size: 36px;
-            font-weight: 800;
-            color: var(--primary-color);
-            margin-bottom: 0;
-        }
-
-        .header-sub {
-            font-size: 18px;
-            font-weight: 400;
-            color: #a9b8c1;
-            margin-bottom: 2rem;
-        }
-
-        .trip-card {
-            background-color: var(--card-bg);
-            color: var(--text-color);
-            border-left: 5px solid var(--card-border);
-            border-radius: 12px;
-            padding: 16px;
-            margin: 15px 0;
-            box-shadow: 0 4px 10px rgba(0,0,0,0.3);
-        }
-
-        .trip-card strong {
-            color: var(--primary-color);
-        }
 
-        .stButton>button {
-            background-color: var(--primary-color) !important;
-            color: white !important;
-            font-weight: 600 !important;
-            border-radius: 8px !important;
-        }
-
-        .stTextInput>div>input, .stNumberInput>div>input, .stDateInput input {
-            background-color: var(--card-bg);
-            color: var(--text-color);
-        }
-
-        .stPageLink {
-            padding: 12px 20px;
-            background-color: var(--card-bg);
-            border-radius: 10px;
-            font-weight: 600;
-            color: var(--text-color) !important;
-            display: block;
-            text-decoration: none !important;
-            margin-bottom: 12px;
-            transition: background-color 0.3s ease, transform 0.2s ease;
-            text-align: center;
-        }
-        .stPageLink span {
-            color: var(--text-color) !important;
-        }
-
-        .stPageLink:hover {
-            background-color: var(--primary-color);
-            color: #ffffff !important;
-            transform: scale(1.02);
-        }
-    </style>
-""", unsafe_allow_html=True)
+# ──────── Custom Styles ──────── #
+apply_theme("pages.css")
 
 
 st.markdown("<div class='header-main'>Personalized Trip Planner</div>", unsafe_allow_html=True)
 st.markdown("<div class='header-sub'>Tell us your dream destination and interests, and let SmartTravel AI design the perfect itinerary</div>", unsafe_allow_html=True)
 
 # ──────── Auth Check ──────── #
-if "authentication_status" not in st.session_state or st.session_state["authentication_status"] != True:
-    st.warning("Please log in from the home page to access this page.")
-    st.stop()
+require_login()
 
 user = st.session_state.get("username", "unknown-user")
 
@@ -129,60 +36,122 @@ with st.form("trip_form"):
     submitted = st.form_submit_button("Generate Travel Plan")
 
 if submitted:
-    with st.spinner("SmartTravel AI is preparing your itinerary..."):
-        prompt = (
-            f"Create a {days}-day travel itinerary for {destination} starting from {trip_start}. "
-            f"The user is interested in {interests}. "
-            f"The estimated budget per day is ₹{budget_per_day:.2f}. "
-            f"Make sure the plan is fun, practical, and respects the budget."
-        )
-        try:
-            response = ask_gemini(prompt)
-            st.success("Your itinerary is ready!")
-            st.markdown(response)
-
-            save_trip(user, {
-                "destination": destination,
-                "interests": interests,
-                "days": days,
-                "start_date": str(trip_start),
-                "budget_per_day": budget_per_day,
-                "favorite": False,
-                "itinerary": response
-            })
-
-            st.session_state["current_trip"] = {
-                "destination": destination,
-                "interests": interests,
-                "days": days,
-                "start_date": str(trip_start),
-                "budget_per_day": budget_per_day,
-                "gender": st.session_state.get("gender", "Prefer not to say")
-            }
-
-        except Exception as e:
-            st.error(f"Error generating itinerary: {str(e)}")
+    status = st.empty()
+    status.info("SmartTravel AI is preparing your itinerary...")
+    prompt = (
+        f"Create a {days}-day travel itinerary for {destination} starting from {trip_start}. "
+        f"The user is interested in {interests}. "
+        f"The estimated budget per day is ₹{budget_per_day:.2f}. "
+        f"Make sure the plan is fun, practical, and respects the budget."
+    )
+    try:
+        # Render tokens as they arrive; only the fully assembled text is saved.
+        response = st.write_stream(ask_gemini_stream(prompt))
+        status.success("Your itinerary is ready!")
+
+        trip_id = save_trip(user, {
+            "destination": destination,
+            "interests": interests,
+            "days": days,
+            "start_date": str(trip_start),
+            "budget_per_day": budget_per_day,
+            "favorite": False,
+            "itinerary": response
+        })
+        st.session_state.pop("pdf-zip-bytes", None)
+
+        st.session_state["current_trip"] = {
+            "id": trip_id,
+            "destination": destination,
+            "interests": interests,
+            "days": days,
+            "start_date": str(trip_start),
+            "budget_per_day": budget_per_day,
+            "gender": st.session_state.get("gender", "Prefer not to say")
+        }
+
+    except GeminiBusyError as e:
+        status.empty()
+        st.warning(str(e))
+    except Exception as e:
+        status.empty()
+        st.error(f"Error generating itinerary: {str(e)}")
 
 # ──────── Past Trips Section ──────── #
 st.markdown("---")
 st.subheader("Your Saved Trips")
 
-filter_dest = st.text_input("🔎 Search by Destination")
+search_text = st.text_input("🔎 Search Trips", placeholder="Destination, interests or anything in the itinerary")
+
+# Facet choices show how many trips each would leave, given the search and other facets.
+facets = {name: st.session_state.get(f"facet-{name}", "Any") for name in ("duration", "budget", "month")}
+facets = {name: None if value == "Any" else value for name, value in facets.items()}
+facets["favorite"] = 1 if st.session_state.get("facet-favorite") else None
+counts = trip_facets(user, search_text, facets)
+
+def facet_options(name, order):
+    # The current choice stays listed even when the search leaves it empty.
+    return ["Any"] + [value for value in order if counts[name].get(value) or value == facets[name]]
+
+def facet_label(name):
+    return lambda value: value if value == "Any" else f"{value} ({counts[name].get(value, 0)})"
+
+colF1, colF2, colF3, colF4 = st.columns(4)
+with colF1:
+    st.checkbox(f"Favorites only ({counts['favorite'].get(1, 0)})", key="facet-favorite")
+with colF2:
+    st.selectbox("Duration", facet_options("duration", [band[0] for band in DURATION_BANDS]), format_func=facet_label("duration"), key="facet-duration")
+with colF3:
+    st.selectbox("Budget / Day", facet_options("budget", [band[0] for band in BUDGET_BANDS]), format_func=facet_label("budget"), key="facet-budget")
+with colF4:
+    st.selectbox("Start Month", facet_options("month", sorted({*counts["month"], facets["month"]} - {None}, reverse=True)), format_func=facet_label("month"), key="facet-month")
+
+# Only one page of trips is loaded and rendered; a new search starts again at page one.
+total = count_trips(user, search_text, facets)
+page_count = max(1, -(-total // TRIPS_PER_PAGE))
+search_state = (search_text, tuple(sorted(facets.items())))
+if st.session_state.get("trips-search") != search_state:
+    st.session_state["trips-search"] = search_state
+    st.session_state["trips-page"] = 0
+page = min(st.session_state.get("trips-page", 0), page_count - 1)
 
 col1, col2 = st.columns([3, 1])
+with col1:
+    trip_count = total if not search_text and not any(facets.values()) else count_trips(user)
+    if trip_count:
+        # Built once, in the click handler; the bytes are kept while the set of trips
+        # (count and newest id, both index lookups) is the one they were built from, so
+        # a save or delete in another tab drops them too.
+        newest = load_trip_summaries(user, limit=1)
+        zip_version = (trip_count, newest[0]["id"] if newest else None)
+        if st.session_state.get("pdf-zip-version") != zip_version:
+            st.session_state.pop("pdf-zip-bytes", None)
+        if "pdf-zip-bytes" not in st.session_state:
+            if st.button("Prepare All Itineraries (ZIP)"):
+                st.session_state["pdf-zip-bytes"] = generate_pdf_zip(load_trips(user))
+                st.session_state["pdf-zip-version"] = zip_version
+        if "pdf-zip-bytes" in st.session_state:
+            st.download_button(
+                label="Download All Itineraries (ZIP)",
+                data=st.session_state["pdf-zip-bytes"],
+                file_name="smarttravel_itineraries.zip",
+                mime="application/zip",
+                key="pdf-zip"
+            )
 with col2:
     if st.button("Clear All My Trips"):
         clear_trips(user)
+        st.session_state.pop("pdf-zip-bytes", None)
         st.success("All your trips have been deleted.")
         st.rerun()
 
-past_trips = load_trips(user)
-filtered = [trip for trip in past_trips if filter_dest.lower() in trip["destination"].lower()]
+filtered = search_trips(user, search_text, facets, offset=page * TRIPS_PER_PAGE, limit=TRIPS_PER_PAGE)
 
 if not filtered:
     st.info("No trips found.")
 else:
-    for i, trip in enumerate(reversed(filtered), 1):
+    st.caption(f"Showing {page * TRIPS_PER_PAGE + 1}-{page * TRIPS_PER_PAGE + len(filtered)} of {total} trips")
+    for i, trip in enumerate(filtered, page * TRIPS_PER_PAGE + 1):
         title = f"Trip #{i}: {trip['destination']} ({trip['days']} days)"
         if trip.get("favorite"):
             title += " ★"
@@ -196,11 +165,12 @@ else:
             st.markdown(trip["itinerary"])
             st.markdown("</div>", unsafe_allow_html=True)
 
-            colA, colB, colC = st.columns(3)
+            colA, colB, colC, colD = st.columns(4)
 
             with colA:
-                if st.button(f"{'Unfavorite' if trip.get('favorite') else 'Favorite'}", key=f"fav-{i}"):
-                    mark_favorite(user, trip["destination"], not trip.get("favorite"))
+                if st.button(f"{'Unfavorite' if trip.get('favorite') else 'Favorite'}", key=f"fav-{trip['id']}"):
+                    mark_favorite(user, trip["id"], not trip.get("favorite"))
+                    st.session_state.pop("pdf-zip-bytes", None)
                     st.rerun()
 
             with colB:
@@ -210,17 +180,40 @@ else:
                 st.markdown(href, unsafe_allow_html=True)
 
             with colC:
-                pdf_path = generate_pdf(trip, f"{trip['destination'].replace(' ', '_')}_itinerary.pdf")
-                with open(pdf_path, "rb") as f:
+                # PDFs are rendered only on request; rendered bytes are cached by trip content.
+                pdf_requested_key = f"pdf-requested-{trip_digest(trip)}"
+                if not st.session_state.get(pdf_requested_key):
+                    if st.button("Prepare PDF", key=f"prepare-pdf-{trip['id']}", use_container_width=True):
+                        st.session_state[pdf_requested_key] = True
+                if st.session_state.get(pdf_requested_key):
                     st.download_button(
                         label="Download as PDF",
-                        data=f,
-                        file_name=os.path.basename(pdf_path),
+                        data=render_pdf_cached(trip),
+                        file_name=pdf_filename(trip),
                         mime="application/pdf",
                         use_container_width=True,
-                        key=f"pdf-{i}"
+                        key=f"pdf-{trip['id']}"
                     )
 
+            with colD:
+                if st.button("Delete Trip", key=f"delete-{trip['id']}", use_container_width=True):
+                    delete_trip(user, trip["id"])
+                    st.session_state.pop("pdf-zip-bytes", None)
+                    st.rerun()
+
+    if page_count > 1:
+        colP1, colP2, colP3 = st.columns([1, 2, 1])
+        with colP1:
+            if st.button("← Previous", disabled=page == 0, use_container_width=True):
+                st.session_state["trips-page"] = page - 1
+                st.rerun()
+        with colP2:
+            st.markdown(f"<div style='text-align: center;'>Page {page + 1} of {page_count}</div>", unsafe_allow_html=True)
+        with colP3:
+            if st.button("Next →", disabled=page >= page_count - 1, use_container_width=True):
+                st.session_state["trips-page"] = page + 1
+                st.rerun()
+
 # ──────── Navigation ──────── #
 st.markdown("---")
 st.markdown("<h3 style='color: var(--primary-color);'>Navigate to Other Tools</h3>", unsafe_allow_html=True)
@@ -1,110 +1,30 @@
 import streamlit as st
-import pandas as pd
-from utils.expense_utils import load_expenses, save_expense, clear_expenses
-from utils.db import load_trips
+from utils.expense_utils import load_expense_frame, load_expense_totals, category_totals, save_expense, clear_expenses
+from utils.db import trip_destinations
 from datetime import datetime
-import matplotlib.pyplot as plt
+from utils.charts import chart_key, category_pie_png, category_pie_spec
+from utils.theme import apply_theme
+from utils.session import require_login
 
 st.set_page_config(page_title="SmartTravel Expense Tracker", layout="wide")
 
 # ──────────────── Apply Custom Style ──────────────── #
-st.markdown("""
-    <style>
-        :root {
-            color-scheme: light dark;
-        }
-
-        body {
-            background-color: var(--background-color, #111927);
-            color: var(--text-color, #fefefe);
-            font-family: 'Segoe UI', sans-serif;
-        }
-
-        @media (prefers-color-scheme: light) {
-            body {
-                --primary-color: #0fa3b1;
-                --text-color: #111927;
-                --background-color: #ffffff;
-                --card-bg: #c6e8f4;
-                --card-border: #0fa3b1;
-            }
-        }
-
-        @media (prefers-color-scheme: dark) {
-            body {
-                --primary-color: #00c6ff;
-                --text-color: #fefefe;
-                --background-color: #111927;
-                --card-bg: #1e2f4d;
-                --card-border: #00c6ff;
-            }
-        }
-
-        .block-container {
-            padding-top: 2rem;
-        }
-
-        .stApp h1, .stApp h2, .stApp h3, .stApp h4 {
-            color: var(--primary-color);
-        }
-
-        .stButton>button, .stDownloadButton button {
-            background-color: var(--primary-color) !important;
-            color: white !important;
-            font-weight: bold;
-            border-radius: 10px;
-        }
-
-        .stSelectbox>div>div, .stNumberInput>div>input, .stTextInput>div>input {
-            background-color: var(--card-bg) !important;
-            color: var(--text-color) !important;
-        }
-
-        .stDataFrame, .stTable, .stMarkdown {
-            color: var(--text-color);
-        }
-
-        .stPageLink {
-            padding: 12px 20px;
-            background-color: var(--card-bg);
-            border-radius: 10px;
-            font-weight: 600;
-            color: var(--text-color) !important;
-            display: block;
-            text-decoration: none !important;
-            margin-bottom: 12px;
-            transition: background-color 0.3s ease, transform 0.2s ease;
-            text-align: center;
-        }
-        .stPageLink span {
-            color: var(--text-color) !important;
-        }
-
-        .stPageLink:hover {
-            background-color: var(--primary-color);
-            color: #ffffff !important;
-            transform: scale(1.02);
-        }
-    </style>
-""", unsafe_allow_html=True)
+apply_theme("pages.css")
 
 st.title("AI-Powered Expense Tracker")
 
 # --- Ensure user is logged in ---
-if "authentication_status" not in st.session_state or st.session_state["authentication_status"] != True:
-    st.warning("Please log in from the home page to access this page.")
-    st.stop()
+require_login()
 
 user = st.session_state.get("username", "unknown-user")
 
 # --- Trip Options (from saved itineraries) ---
-user_trips = load_trips(user)
-trip_options = sorted(set(trip["destination"] for trip in user_trips))
+trip_options = trip_destinations(user)
 
 # --- If no trips exist, suggest planning one first ---
 if not trip_options:
     st.info("You haven't planned any trips yet. Plan one to start logging expenses.")
-    st.page_link("pages/Planner.py", label="Plan a Trip First")
+    st.page_link("pages/1_Planner.py", label="Plan a Trip First")
     st.stop()
 
 # --- Log a New Expense ---
@@ -135,13 +55,13 @@ with st.form("expense_form"):
 st.markdown("---")
 st.subheader("Expense Summary")
 
-expenses = load_expenses(user)
-if not expenses:
+totals = load_expense_totals(user)
+if not totals["count"]:
     st.info("No expenses recorded yet.")
     st.stop()
 
-df = pd.DataFrame(expenses)
-df["date"] = pd.to_datetime(df["date"])
+# Running totals answer every summary below; the typed rows are only needed for the table and CSV export.
+df = load_expense_frame(user)
 
 # --- Filters ---
 st.markdown("### Filters")
@@ -149,33 +69,38 @@ col1, col2 = st.columns(2)
 with col1:
     selected_trip = st.selectbox("Filter by Trip", ["All"] + trip_options)
 with col2:
-    selected_category = st.selectbox("Filter by Category", ["All"] + df["category"].unique().tolist())
+    selected_category = st.selectbox("Filter by Category", ["All"] + list(totals["by_category"]))
 
 # --- Apply filters ---
-filtered_df = df.copy()
+filtered_df = df
 if selected_trip != "All":
     filtered_df = filtered_df[filtered_df["trip"] == selected_trip]
 if selected_category != "All":
     filtered_df = filtered_df[filtered_df["category"] == selected_category]
 
+category_breakdown = category_totals(
+    totals,
+    trip=None if selected_trip == "All" else selected_trip,
+    category=None if selected_category == "All" else selected_category,
+)
+
 # --- Summary + Table ---
-total = filtered_df["amount"].sum()
+total = sum(category_breakdown.values())
 st.write(f"**Total Spent:** ₹{total:.2f}")
 st.dataframe(filtered_df[["date", "trip", "category", "amount", "notes"]].sort_values(by="date", ascending=False))
 
 # --- Pie Chart ---
-if not filtered_df.empty:
+if category_breakdown:
     st.markdown("### Category Breakdown")
-    category_totals = filtered_df.groupby("category")["amount"].sum()
-    fig, ax = plt.subplots()
-    ax.pie(category_totals, labels=category_totals.index, autopct="%1.1f%%", startangle=90)
-    ax.axis("equal")
-    st.pyplot(fig)
+    breakdown_key = chart_key(category_breakdown)
+    if st.toggle("Interactive chart", key="interactive_chart"):
+        st.vega_lite_chart(category_pie_spec(breakdown_key), use_container_width=True)
+    else:
+        st.image(category_pie_png(breakdown_key))
 
 # --- Per-Trip Totals ---
 st.markdown("### Per-Trip Total Expenses")
-trip_totals = df.groupby("trip")["amount"].sum().reset_index()
-st.table(trip_totals.rename(columns={"trip": "Trip", "amount": "Total Spent (₹)"}))
+st.table({"Trip": list(totals["by_trip"]), "Total Spent (₹)": list(totals["by_trip"].values())})
 
 # --- Export to CSV ---
 csv = filtered_df.to_csv(index=False)
@@ -1,116 +1,20 @@
 import streamlit as st
 import streamlit.components.v1 as components
 from utils.gemini_client import ask_gemini
+from utils.theme import apply_theme
+from utils.session import require_login
 
 st.set_page_config(page_title="Chat & Translator", layout="wide")
 
 # ──────── Apply Custom Style ──────── #
-st.markdown("""
-    <style>
-        :root {
-            color-scheme: light dark;
-        }
-
-        body {
-            background-color: var(--background-color, #111927);
-            color: var(--text-color, #fefefe);
-            font-family: 'Segoe UI', sans-serif;
-        }
-
-        @media (prefers-color-scheme: light) {
-            body {
-                --primary-color: #0fa3b1;
-                --text-color: #111927;
-                --background-color: #ffffff;
-                --card-bg: #c6e8f4;
-                --card-border: #0fa3b1;
-            }
-        }
-
-        @media (prefers-color-scheme: dark) {
-            body {
-                --primary-color: #00c6ff;
-                --text-color: #fefefe;
-                --background-color: #111927;
-                --card-bg: #1e2f4d;
-                --card-border: #00c6ff;
-            }
-        }
-
-        .block-container {
-            padding-top: 2rem;
-        }
-
-        .translator-header {
-            font-size: 36px;
-            font-weight: 800;
-            color: var(--primary-color);
-            margin-bottom: 0;
-        }
-
-        .translator-sub {
-            font-size: 18px;
-            font-weight: 400;
-            color: var(--text-color);
-            margin-bottom: 2rem;
-        }
-
-        .response-box {
-            background-color: var(--card-bg);
-            color: var(--text-color);
-            border-left: 5px solid var(--card-border);
-            border-radius: 12px;
-            padding: 16px;
-            margin: 10px 0;
-            box-shadow: 0 4px 10px rgba(0,0,0,0.3);
-            font-size: 16px;
-        }
-
-        .stButton>button, .stDownloadButton button {
-            background-color: var(--primary-color) !important;
-            color: white !important;
-            font-weight: bold;
-            border-radius: 10px;
-        }
-
-        .stSelectbox>div>div, .stTextArea textarea {
-            background-color: var(--card-bg) !important;
-            color: var(--text-color) !important;
-            border-radius: 10px;
-        }
-
-        .stPageLink {
-            padding: 12px 20px;
-            background-color: var(--card-bg);
-            border-radius: 10px;
-            font-weight: 600;
-            color: var(--text-color) !important;
-            display: block;
-            text-decoration: none !important;
-            margin-bottom: 12px;
-            transition: background-color 0.3s ease, transform 0.2s ease;
-            text-align: center;
-        }
-        .stPageLink span {
-            color: var(--text-color) !important;
-        }
-
-        .stPageLink:hover {
-            background-color: var(--primary-color);
-            color: #ffffff !important;
-            transform: scale(1.02);
-        }
-    </style>
-""", unsafe_allow_html=True)
+apply_theme("pages.css")
 
 # ──────── Header ──────── #
 st.markdown("<div class='translator-header'> Chat & Translator</div>", unsafe_allow_html=True)
 st.markdown("<div class='translator-sub'>Type in your language and get a reply in another</div>", unsafe_allow_html=True)
 
 # ──────── Auth Check ──────── #
-if "authentication_status" not in st.session_state or st.session_state["authentication_status"] != True:
-    st.warning("Please log in from the home page to access this page.")
-    st.stop()
+require_login()
 
 user = st.session_state.get("username", "unknown-user")
 
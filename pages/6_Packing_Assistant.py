@@ -1,96 +1,19 @@
 import streamlit as st
-from utils.gemini_client import ask_gemini
+from utils.gemini_client import ask_gemini_stream, GeminiBusyError, CACHE_TTL_PACKING
+from utils.season import resolve_season
 from datetime import datetime
+from utils.theme import apply_theme
+from utils.session import require_login
 
 st.set_page_config(page_title="AI Packing Assistant", layout="wide")
 
 # ──────────────── Apply Unified Styling ──────────────── #
-st.markdown("""
-    <link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css" rel="stylesheet">
-    <style>
-        :root {
-            color-scheme: light dark;
-        }
-
-        body {
-            background-color: var(--background-color, #111927);
-            color: var(--text-color, #fefefe);
-            font-family: 'Segoe UI', sans-serif;
-        }
-
-        @media (prefers-color-scheme: light) {
-            body {
-                --primary-color: #0fa3b1;
-                --text-color: #111927;
-                --background-color: #ffffff;
-                --card-bg: #c6e8f4;
-                --card-border: #0fa3b1;
-            }
-        }
-
-        @media (prefers-color-scheme: dark) {
-            body {
-                --primary-color: #00c6ff;
-                --text-color: #fefefe;
-                --background-color: #111927;
-                --card-bg: #1e2f4d;
-                --card-border: #00c6ff;
-            }
-        }
-
-        .block-container {
-            padding-top: 2rem;
-        }
-
-        .stApp h1, .stApp h2, .stApp h3 {
-            color: var(--primary-color);
-        }
-
-        .stButton>button {
-            background-color: var(--primary-color) !important;
-            color: white !important;
-            font-weight: 600;
-            border-radius: 8px;
-        }
-
-        .stTextInput>div>input,
-        .stNumberInput>div>input,
-        .stSelectbox>div>div {
-            background-color: var(--card-bg) !important;
-            color: var(--text-color) !important;
-        }
-
-        .stPageLink {
-            padding: 12px 20px;
-            background-color: var(--card-bg);
-            border-radius: 10px;
-            font-weight: 600;
-            color: var(--text-color) !important;
-            display: block;
-            text-decoration: none !important;
-            margin-bottom: 12px;
-            transition: background-color 0.3s ease, transform 0.2s ease;
-            text-align: center;
-        }
-
-        .stPageLink span {
-            color: var(--text-color) !important;
-        }
-
-        .stPageLink:hover {
-            background-color: var(--primary-color);
-            color: #ffffff !important;
-            transform: scale(1.02);
-        }
-    </style>
-""", unsafe_allow_html=True)
+apply_theme("pages.css")
 
 st.markdown("<h1>AI Packing Assistant</h1>", unsafe_allow_html=True)
 
 # ──────────────── Auth Check ──────────────── #
-if "authentication_status" not in st.session_state or st.session_state["authentication_status"] != True:
-    st.warning("Please log in from the home page to access this page.")
-    st.stop()
+require_login()
 
 user = st.session_state.get("username", "unknown-user")
 
@@ -112,32 +35,29 @@ if destination.strip() == "":
 
 # ──────────────── Packing List Generation ──────────────── #
 if st.button("Generate Packing List"):
-    with st.spinner("Inferring season and generating your packing checklist..."):
-
-        season_prompt = f"""
-        Today is {date_string}. I'm planning to travel to {destination}.
-        Please accurately determine the current season (Summer, Winter, Spring, Autumn)
-        at the destination based on its geographical location and hemisphere.
-        Output just one word only.
-        """
-
-        try:
-            season_response = ask_gemini(season_prompt).strip().split()[0].capitalize()
-            valid_seasons = ["Summer", "Winter", "Spring", "Autumn", "Wet", "Dry"]
-            season = season_response if season_response in valid_seasons else "Unknown"
-            st.info(f"Inferred season for {destination}: **{season}**")
-        except Exception as e:
-            season = "Unknown"
-            st.warning(f"Could not determine season. Defaulting to 'Unknown'. ({str(e)})")
+    with st.spinner("Generating your packing checklist..."):
+
+        season = resolve_season(destination, now.date())
+        if season:
+            st.info(f"Season in {destination} right now: **{season}**")
+            season_guidance = f"the expected season is {season.lower()}"
+            clothing_guidance = f"Weather-appropriate clothing for {season}"
+        else:
+            # Unknown place: let the packing generation infer the season itself instead of a separate round trip.
+            season_guidance = (
+                "determine the current season (Summer, Winter, Spring, Autumn, Wet, Dry, Tropical, Polar Summer or Polar Winter) at the destination "
+                "from its location and hemisphere, and state it on the first line as 'Season: <season>'"
+            )
+            clothing_guidance = "Weather-appropriate clothing for that season"
 
         packing_prompt = f"""
         I'm traveling to {destination} for {duration} days.
-        My current local date is {date_string}, and the expected season is {season.lower()}.
+        My current local date is {date_string}; {season_guidance}.
         I identify as {gender.lower()}.
 
         Generate a packing list considering:
         - Local cultural dress norms
-        - Weather-appropriate clothing for {season}
+        - {clothing_guidance}
         - Essentials for a {duration}-day trip
         - Tech, health, safety, and documents
         - Optional items and what not to pack
@@ -152,13 +72,10 @@ if st.button("Generate Packing List"):
         """
 
         try:
-            packing_response = ask_gemini(packing_prompt)
-            st.success(f"Packing list for {destination} ({season}) is ready!")
-            try:
-                st.markdown(packing_response)
-            except:
-                st.warning("Couldn't render the response. Showing raw output instead:")
-                st.code(packing_response, language="markdown")
+            packing_response = st.write_stream(ask_gemini_stream(packing_prompt, cache_ttl=CACHE_TTL_PACKING))
+            st.success(f"Packing list for {destination} is ready!")
+        except GeminiBusyError as e:
+            st.warning(str(e))
         except Exception as e:
             st.error(f"Error generating packing list: {str(e)}")
 
@@ -1,120 +1,21 @@
 import streamlit as st
-from utils.gemini_client import ask_gemini
 from utils.db import save_booking
+from utils.booking_search import MAX_PAGES, flight_query, search_flights
+from utils.listings import FLIGHT_SORTS
 from datetime import datetime, timedelta
-import re
+from utils.theme import apply_theme
+from utils.session import require_login
 
 st.set_page_config(page_title="Flight Booking", layout="wide")
 
 # ──────────────── Custom Styling ──────────────── #
-st.markdown("""
-    <style>
-        :root {
-            color-scheme: light dark;
-        }
-
-        body {
-            background-color: var(--background-color, #111927);
-            color: var(--text-color, #fefefe);
-            font-family: 'Segoe UI', sans-serif;
-        }
-
-        @media (prefers-color-scheme: light) {
-            body {
-                --primary-color: #0fa3b1;
-                --text-color: #111927;
-                --background-color: #ffffff;
-                --card-bg: #c6e8f4;
-                --card-border: #0fa3b1;
-            }
-        }
-
-        @media (prefers-color-scheme: dark) {
-            body {
-                --primary-color: #00c6ff;
-                --text-color: #fefefe;
-                --background-color: #111927;
-                --card-bg: #1e2f4d;
-                --card-border: #00c6ff;
-            }
-        }
-
-        .block-container {
-            padding-top: 2rem;
-        }
-
-        .stApp h1, .stApp h2, .stApp h3, .stApp h4 {
-            color: var(--primary-color);
-        }
-
-        .stButton>button, .stDownloadButton button {
-            background-color: var(--primary-color) !important;
-            color: white !important;
-            font-weight: bold;
-            border-radius: 10px;
-        }
-
-        .recommendation-card {
-           background-color: var(--card-bg);
-           color: var(--text-color);
-           border-left: 5px solid var(--primary-color);
-           border-radius: 12px;
-           padding: 16px;
-           margin: 10px 0;
-           box-shadow: 0 4px 10px rgba(0,0,0,0.3);
-           font-size: 16px;
-        }
-
-        .recommendation-card strong {
-            color: var(--primary-color);
-        }
-
-        .header-crazy {
-            font-size: 36px;
-            font-weight: 800;
-            color: var(--primary-color);
-            margin-bottom: 0;
-        }
-
-        .header-tagline {
-            font-size: 18px;
-            font-weight: 400;
-            color: #a9b8c1;
-            margin-bottom: 2rem;
-        }
-
-        .stPageLink {
-            padding: 12px 20px;
-            background-color: var(--card-bg);
-            border-radius: 10px;
-            font-weight: 600;
-            color: var(--text-color) !important;
-            display: block;
-            text-decoration: none !important;
-            margin-bottom: 12px;
-            transition: background-color 0.3s ease, transform 0.2s ease;
-            text-align: center;
-        }
-
-        .stPageLink span {
-            color: var(--text-color) !important;
-        }
-
-        .stPageLink:hover {
-            background-color: var(--primary-color);
-            color: #ffffff !important;
-            transform: scale(1.02);
-        }
-    </style>
-""", unsafe_allow_html=True)
+apply_theme("pages.css")
 
 st.markdown("<div class='header-crazy'>Flight Booking</div>", unsafe_allow_html=True)
 st.markdown("<div class='header-tagline'>Find the best flights tailored to your trip</div>", unsafe_allow_html=True)
 
 # --- Auth Check ---
-if "authentication_status" not in st.session_state or st.session_state["authentication_status"] != True:
-    st.warning("Please log in from the home page to access this page.")
-    st.stop()
+require_login()
 
 user = st.session_state.get("username", "unknown-user")
 trip = st.session_state.get("current_trip", {})
@@ -128,60 +29,62 @@ return_date = start_date + timedelta(days=days)
 
 st.write(f" **Departure:** {start_date.strftime('%Y-%m-%d')} |  **Return:** {return_date.strftime('%Y-%m-%d')}")
 
+col1, col2 = st.columns(2)
+with col1:
+    sort_by = st.selectbox("Sort by", list(FLIGHT_SORTS))
+with col2:
+    max_stops = st.selectbox("Stops", ["Any", "Non-stop only", "Up to 1 stop"])
+
 # --- Flight Generator ---
+# Results live in session state so that sorting, booking or loading more doesn't
+# throw them away on the rerun; they are shown only while the inputs still match.
+query = flight_query(from_city, to_city, start_date, return_date)
+search = st.session_state.get("flight_search")
+if search and search["query"] != query:
+    search = None
+
 if st.button("Find Flights"):
     with st.spinner("Searching for best Gemini-powered flight options..."):
-        prompt = f"""
-Generate 3 **fictional but realistic** flight options for a traveler going from {from_city} to {to_city}.
-
-Departure: {start_date.strftime('%Y-%m-%d')}  
-Return: {return_date.strftime('%Y-%m-%d')}  
-The traveler wants affordable, common airline options for this route.
-
-You are NOT providing real-time flight data — just simulate **plausible examples** with realistic details.
-
-For each flight, return in markdown:
-- **Airline Name (Flight Number)**
-- Departure and Arrival Time
-- Duration
-- Stops (Non-stop or via)
-- Hypothetical Price in INR
-- 1 line of amenities (like meals, baggage, Wi-Fi)
-
-Do NOT include disclaimers or real booking links. Just 3 fictional listings.
-"""
         try:
-            response = ask_gemini(prompt)
-            st.success("Here are your flight options:")
-
-            flights = re.split(r"\n(?=\*\*)", response.strip())
-            for i, flight in enumerate(flights):
-                if flight.strip():
-                    st.markdown(f"<div class='recommendation-card'>{flight.strip()}</div>", unsafe_allow_html=True)
-
-                    book_key = f"booked_{i}"
-                    trigger_key = f"trigger_{i}"
-
-                    if st.button("Book This Flight", key=trigger_key):
-                        st.session_state[book_key] = True
-
-                    if st.session_state.get(book_key):
-                        booking = {
-                            "type": "flight",
-                            "from": from_city,
-                            "to": to_city,
-                            "departure_date": start_date.strftime('%Y-%m-%d'),
-                            "return_date": return_date.strftime('%Y-%m-%d'),
-                            "details": flight.strip()
-                        }
-                        save_booking(user, booking)
-                        st.session_state["selected_flight"] = booking
-                        st.success("Booking confirmed and saved!")
-                        st.session_state[book_key] = False
-
+            search = st.session_state["flight_search"] = {"query": query, "flights": search_flights(query), "pages": 1}
         except Exception as e:
             st.error(f"Error generating flight options: {str(e)}")
 
+if search:
+    flights = search["flights"]
+    if max_stops != "Any":
+        flights = [flight for flight in flights if flight.stops <= (0 if max_stops == "Non-stop only" else 1)]
+    flights = sorted(flights, key=FLIGHT_SORTS[sort_by])
+    if flights:
+        st.success("Here are your flight options:")
+    else:
+        st.info("No flights match these filters.")
+
+    for flight in flights:
+        st.markdown(f"<div class='recommendation-card'>{flight.to_markdown()}</div>", unsafe_allow_html=True)
+
+        if st.button("Book This Flight", key=f"book_flight_{flight.airline}_{flight.flight_number}"):
+            booking = {
+                "type": "flight",
+                "from": from_city,
+                "to": to_city,
+                "departure_date": start_date.strftime('%Y-%m-%d'),
+                "return_date": return_date.strftime('%Y-%m-%d'),
+                "listing": flight.to_dict()
+            }
+            save_booking(user, booking)
+            st.session_state["selected_flight"] = booking
+            st.success("Booking confirmed and saved!")
+
+    if search["pages"] < MAX_PAGES and st.button("Load More Flights"):
+        with st.spinner("Finding more flights..."):
+            try:
+                search["flights"] = search["flights"] + search_flights(query, shown=search["flights"])
+                search["pages"] += 1
+                st.rerun()
+            except Exception as e:
+                st.error(f"Error generating flight options: {str(e)}")
+
 # --- Footer Navigation ---
 st.markdown("---")
 st.markdown("### Navigate to Other Tools")
@@ -1,120 +1,21 @@
 import streamlit as st
-from utils.gemini_client import ask_gemini
 from utils.db import save_booking
+from utils.booking_search import MAX_PAGES, hotel_query, search_hotels
+from utils.listings import HOTEL_SORTS
 from datetime import datetime, timedelta
-import re
+from utils.theme import apply_theme
+from utils.session import require_login
 
 st.set_page_config(page_title="Hotel Booking", layout="wide")
 
 # ──────────────── Custom Styling ──────────────── #
-st.markdown("""
-    <style>
-        :root {
-            color-scheme: light dark;
-        }
-
-        body {
-            background-color: var(--background-color, #111927);
-            color: var(--text-color, #fefefe);
-            font-family: 'Segoe UI', sans-serif;
-        }
-
-        @media (prefers-color-scheme: light) {
-            body {
-                --primary-color: #0fa3b1;
-                --text-color: #111927;
-                --background-color: #ffffff;
-                --card-bg: #c6e8f4;
-                --card-border: #0fa3b1;
-            }
-        }
-
-        @media (prefers-color-scheme: dark) {
-            body {
-                --primary-color: #00c6ff;
-                --text-color: #fefefe;
-                --background-color: #111927;
-                --card-bg: #1e2f4d;
-                --card-border: #00c6ff;
-            }
-        }
-
-        .block-container {
-            padding-top: 2rem;
-        }
-
-        .stApp h1, .stApp h2, .stApp h3, .stApp h4 {
-            color: var(--primary-color);
-        }
-
-        .stButton>button, .stDownloadButton button {
-            background-color: var(--primary-color) !important;
-            color: white !important;
-            font-weight: bold;
-            border-radius: 10px;
-        }
-
-        .hotel-card {
-            background-color: var(--card-bg);
-            color: var(--text-color);
-            border-left: 5px solid var(--primary-color);
-            border-radius: 12px;
-            padding: 16px;
-            margin: 10px 0;
-            box-shadow: 0 4px 10px rgba(0,0,0,0.3);
-            font-size: 16px;
-        }
-
-        .hotel-card strong {
-            color: var(--primary-color);
-        }
-
-        .header-main {
-            font-size: 36px;
-            font-weight: 800;
-            color: var(--primary-color);
-            margin-bottom: 0;
-        }
-
-        .header-sub {
-            font-size: 18px;
-            font-weight: 400;
-            color: #a9b8c1;
-            margin-bottom: 2rem;
-        }
-
-        .stPageLink {
-            padding: 12px 20px;
-            background-color: var(--card-bg);
-            border-radius: 10px;
-            font-weight: 600;
-            color: var(--text-color) !important;
-            display: block;
-            text-decoration: none !important;
-            margin-bottom: 12px;
-            transition: background-color 0.3s ease, transform 0.2s ease;
-            text-align: center;
-        }
-
-        .stPageLink span {
-            color: var(--text-color) !important;
-        }
-
-        .stPageLink:hover {
-            background-color: var(--primary-color);
-            color: #ffffff !important;
-            transform: scale(1.02);
-        }
-    </style>
-""", unsafe_allow_html=True)
+apply_theme("pages.css")
 
 st.markdown("<div class='header-main'>Hotel Booking</div>", unsafe_allow_html=True)
 st.markdown("<div class='header-sub'>Curated listings tailored to your destination and travel plans</div>", unsafe_allow_html=True)
 
 # ──────── Auth Check ──────── #
-if "authentication_status" not in st.session_state or st.session_state["authentication_status"] != True:
-    st.warning("Please log in from the home page to access this page.")
-    st.stop()
+require_login()
 
 user = st.session_state.get("username", "unknown-user")
 trip = st.session_state.get("current_trip", {})
@@ -123,49 +24,62 @@ trip = st.session_state.get("current_trip", {})
 city = st.text_input("Destination City", trip.get("destination", ""))
 start_date = st.date_input("Check-in Date", datetime.strptime(trip.get("start_date", str(datetime.today().date())), "%Y-%m-%d"))
 days = st.number_input("Number of Nights", min_value=1, max_value=30, value=trip.get("days", 3))
-budget = st.number_input("Estimated Budget per Night (₹)", min_value=500.0, max_value=10000.0, value=float(trip.get("budget_per_day", 4000.0)))
+budget = st.number_input("Estimated Budget per Night (₹)", min_value=500.0, max_value=10000.0, value=min(max(float(trip.get("budget_per_day") or 4000.0), 500.0), 10000.0))
 
 checkout_date = start_date + timedelta(days=days)
 st.write(f"**Stay Duration:** {start_date.strftime('%Y-%m-%d')} → {checkout_date.strftime('%Y-%m-%d')}")
 
+col1, col2 = st.columns(2)
+with col1:
+    sort_by = st.selectbox("Sort by", list(HOTEL_SORTS))
+with col2:
+    min_stars = st.slider("Minimum Rating (★)", min_value=1, max_value=5, value=1)
+
 # ──────── AI Recommendations ──────── #
+# Kept in session state (for the same inputs) so sorting, booking and "load more"
+# reruns don't discard the listings.
+query = hotel_query(city, start_date, days, budget)
+search = st.session_state.get("hotel_search")
+if search and search["query"] != query:
+    search = None
+
 if st.button("Find Hotels"):
     with st.spinner("Looking for top-rated hotels..."):
-        prompt = f"""
-Generate 3 **fictional but realistic** hotel listings in {city} for a {days}-night stay starting on {start_date.strftime('%Y-%m-%d')}. Budget: ₹{budget} per night.
-
-Each hotel should include:
-
-- **Hotel Name** (bold)
-- Price per night in INR
-- Star rating (1-5★)
-- Amenities (e.g., Wi-Fi, AC, Breakfast)
-- Distance from city center or a tourist spot
-
-Only return clean markdown listings. Do **NOT** add disclaimers, real-time accuracy warnings, or booking advice. This is for a mock booking UI only.
-"""
         try:
-            response = ask_gemini(prompt)
-            st.success("Top hotel recommendations:")
-            hotels = re.split(r"\n(?=\*\*)", response.strip())
-
-            for i, hotel in enumerate(hotels):
-                if hotel.strip():
-                    st.markdown(f"<div class='hotel-card'>{hotel.strip()}</div>", unsafe_allow_html=True)
-                    if st.button("Book This Hotel", key=f"book_hotel_{i}"):
-                        booking = {
-                            "type": "hotel",
-                            "destination": city,
-                            "checkin_date": start_date.strftime('%Y-%m-%d'),
-                            "checkout_date": checkout_date.strftime('%Y-%m-%d'),
-                            "details": hotel.strip()
-                        }
-                        save_booking(user, booking)
-                        st.session_state["selected_hotel"] = booking
-                        st.success("Hotel booked and saved successfully!")
+            search = st.session_state["hotel_search"] = {"query": query, "hotels": search_hotels(query), "pages": 1}
         except Exception as e:
             st.error(f"Error generating hotel list: {str(e)}")
 
+if search:
+    hotels = sorted((hotel for hotel in search["hotels"] if hotel.stars >= min_stars), key=HOTEL_SORTS[sort_by])
+    if hotels:
+        st.success("Top hotel recommendations:")
+    else:
+        st.info("No hotels match this rating.")
+
+    for hotel in hotels:
+        st.markdown(f"<div class='hotel-card'>{hotel.to_markdown()}</div>", unsafe_allow_html=True)
+        if st.button("Book This Hotel", key=f"book_hotel_{hotel.name}"):
+            booking = {
+                "type": "hotel",
+                "destination": city,
+                "checkin_date": start_date.strftime('%Y-%m-%d'),
+                "checkout_date": checkout_date.strftime('%Y-%m-%d'),
+                "listing": hotel.to_dict()
+            }
+            save_booking(user, booking)
+            st.session_state["selected_hotel"] = booking
+            st.success("Hotel booked and saved successfully!")
+
+    if search["pages"] < MAX_PAGES and st.button("Load More Hotels"):
+        with st.spinner("Finding more hotels..."):
+            try:
+                search["hotels"] = search["hotels"] + search_hotels(query, shown=search["hotels"])
+                search["pages"] += 1
+                st.rerun()
+            except Exception as e:
+                st.error(f"Error generating hotel list: {str(e)}")
+
 # ──────── Navigation ──────── #
 st.markdown("---")
 st.markdown("### Navigate to Other Tools")
@@ -0,0 +1,64 @@
+import os
+import streamlit as st
+from utils import metrics
+from utils.theme import apply_theme
+from utils.session import require_login
+
+st.set_page_config(page_title="SmartTravel Metrics", layout="wide")
+
+# ──────────────── Custom Styling ──────────────── #
+apply_theme("pages.css")
+
+# ──────────────── Header ──────────────── #
+st.markdown("<div class='header-main'>Performance Metrics</div>", unsafe_allow_html=True)
+st.markdown("<div class='header-sub'>Where page time goes: model calls, storage and PDF rendering in this server process</div>", unsafe_allow_html=True)
+
+# --- Auth check ---
+require_login()
+
+# Comma-separated allow-list; the metrics cover every user's activity and Reset clears
+# them for the whole process, so without a list nobody may look.
+admins = [email.strip().lower() for email in os.getenv("SMARTTRAVEL_ADMIN_EMAILS", "").split(",") if email.strip()]
+if (st.session_state.get("username") or "").strip().lower() not in admins:
+    if admins:
+        st.warning("This page is only available to administrators.")
+    else:
+        st.warning("This page is only available to administrators. Set SMARTTRAVEL_ADMIN_EMAILS to grant access.")
+    st.stop()
+
+col1, col2 = st.columns([1, 5])
+with col1:
+    st.button("Refresh")
+with col2:
+    if st.button("Reset Counters"):
+        metrics.reset()
+
+rows = metrics.snapshot()
+if not rows:
+    st.info("No calls recorded yet. Use the other pages, then refresh.")
+    st.stop()
+
+# --- Slowest pages ---
+st.markdown(f"### By Page (last {metrics.METRICS_WINDOW_SECONDS // 60} minutes)")
+by_page = {}
+for row in rows:
+    page = by_page.setdefault(row["page"], {"Page": row["page"], "Calls": 0, "Total seconds": 0.0, "Worst p99 (ms)": 0.0, "Worst call": ""})
+    page["Calls"] += row["calls"]
+    page["Total seconds"] = round(page["Total seconds"] + row["total_seconds"], 3)
+    if (row["p99_ms"] or 0) > page["Worst p99 (ms)"]:
+        page["Worst p99 (ms)"] = row["p99_ms"]
+        page["Worst call"] = row["call"]
+st.dataframe(sorted(by_page.values(), key=lambda page: page["Worst p99 (ms)"], reverse=True), hide_index=True, use_container_width=True)
+
+# --- Every call ---
+st.markdown("### By Call")
+st.caption("Latency quantiles cover the rolling window; counts, tokens and bytes are totals since the process started.")
+st.dataframe(rows, hide_index=True, use_container_width=True)
+
+# --- Prometheus ---
+exposition = metrics.prometheus_text()
+with st.expander("Prometheus exposition"):
+    if metrics.METRICS_PORT:
+        st.caption(f"Also served at http://<host>:{metrics.METRICS_PORT}/metrics")
+    st.code(exposition, language="text")
+st.download_button("Download metrics.txt", data=exposition, file_name="metrics.txt", mime="text/plain")
@@ -0,0 +1,22 @@
+# test_season.py
+
+from datetime import date
+from utils.season import resolve_season, season_for
+
+def test_tropical_without_wet_months():
+    # Lima is in the tropics with no wet months listed: neither winter nor summer.
+    assert resolve_season("Lima", date(2025, 7, 1)) == "Tropical"
+    assert season_for(1.0, 1) == "Tropical"
+
+def test_tropical_wet_and_dry():
+    assert resolve_season("Goa", date(2025, 7, 1)) == "Wet"
+    assert resolve_season("Goa", date(2025, 1, 1)) == "Dry"
+
+def test_polar():
+    assert resolve_season("Tromsø", date(2025, 12, 1)) == "Polar Winter"
+    assert resolve_season("Svalbard", date(2025, 6, 1)) == "Polar Summer"
+    assert season_for(-75.0, 6) == "Polar Winter"
+
+def test_temperate_hemispheres():
+    assert resolve_season("Kyoto, Japan", date(2025, 4, 1)) == "Spring"
+    assert resolve_season("Sydney", date(2025, 7, 1)) == "Winter"
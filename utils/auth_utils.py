@@ -1,36 +1,255 @@
-import json
+import base64
 import bcrypt
+import hashlib
+import hmac
 import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from utils.storage import DATA_DIR, VersionConflict, user_file, iter_users, migrate_once, locked, file_version, write_json_if_unchanged, atomic_write_json, atomic_create_json, atomic_create_bytes, read_json
 
-USER_DB_FILE = "data/users.json"
+USER_DB_FILE = os.path.join(DATA_DIR, "users.json")
+SESSION_SECRET_FILE = os.path.join(DATA_DIR, ".session_secret")
+PROFILE_FILE = "profile.json"
+
+BCRYPT_ROUNDS = int(os.getenv("SMARTTRAVEL_BCRYPT_ROUNDS", "12"))
+HASH_WORKERS = int(os.getenv("SMARTTRAVEL_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+HASH_QUEUE_LIMIT = int(os.getenv("SMARTTRAVEL_HASH_QUEUE_LIMIT", "32"))
+HASH_WAIT_SECONDS = 5
+SESSION_TTL_SECONDS = int(os.getenv("SMARTTRAVEL_SESSION_TTL", str(12 * 60 * 60)))
+USER_DIRECTORY_RECHECK_SECONDS = float(os.getenv("SMARTTRAVEL_USER_RECHECK_SECONDS", "2"))
+USER_DIRECTORY_MAX_ENTRIES = int(os.getenv("SMARTTRAVEL_USER_DIRECTORY_MAX", "10000"))
+
+class AuthBusyError(Exception):
+    pass
+
+# bcrypt releases the GIL, so a small thread pool keeps hashing off the script
+# threads while the semaphore caps how many logins can queue at once.
+_hash_pool = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="bcrypt")
+_hash_slots = threading.BoundedSemaphore(HASH_QUEUE_LIMIT)
+_session_secret = None
+_session_secret_lock = threading.Lock()
+
+# Process-wide user directory, most recently used first out: email -> (profile, file
+# signature, last checked). Only existing profiles are kept; caching misses would let
+# arbitrary emails tried at login or signup grow it.
+_directory = OrderedDict()
+_directory_lock = threading.Lock()
+
+# ──────────────── Profiles ──────────────── #
+
+def _migrate_legacy_users():
+    legacy = read_json(USER_DB_FILE, {})
+    if isinstance(legacy, dict):
+        for email, user in legacy.items():
+            atomic_write_json(user_file(email, PROFILE_FILE, create_dir=True), user)
+
+def load_user(email):
+    # Served from memory; the profile is re-read only when its file's mtime, inode
+    # or size changed, and that is checked at most every few seconds per user.
+    migrate_once("users", _migrate_legacy_users)
+    now = time.monotonic()
+    with _directory_lock:
+        entry = _directory.get(email)
+        if entry:
+            _directory.move_to_end(email)
+    if entry and now - entry[2] < USER_DIRECTORY_RECHECK_SECONDS:
+        return entry[0]
+
+    path = user_file(email, PROFILE_FILE)
+    signature = file_version(path)
+    if entry and entry[1] == signature:
+        user = entry[0]
+    else:
+        user = read_json(path) if signature else None
+    _cache_user(email, user, signature, now)
+    return user
 
 def load_users():
-    if os.path.exists(USER_DB_FILE):
-        with open(USER_DB_FILE, "r") as f:
-            data = json.load(f)
-            if isinstance(data, dict):
-                return data
-    return {}
+    # Scans every shard and warms the directory; never needed on the login path.
+    migrate_once("users", _migrate_legacy_users)
+    users = {}
+    for email, path in iter_users():
+        user = load_user(email)
+        if user:
+            users[email] = user
+    return users
+
+def _cache_user(email, user, signature, now):
+    with _directory_lock:
+        if user is None:
+            _directory.pop(email, None)
+            return
+        _directory[email] = (user, signature, now)
+        _directory.move_to_end(email)
+        while len(_directory) > USER_DIRECTORY_MAX_ENTRIES:
+            _directory.popitem(last=False)
+
+def _remember(email, user, path):
+    _cache_user(email, user, file_version(path), time.monotonic())
+
+def save_user(email, user):
+    path = user_file(email, PROFILE_FILE, create_dir=True)
+    with locked(path):
+        atomic_write_json(path, user)
+    _remember(email, user, path)
 
 def save_users(users):
-    with open(USER_DB_FILE, "w") as f:
-        json.dump(users, f, indent=2)
+    # Each profile is replaced atomically under its lock; the directory is updated once
+    # the batch is on disk.
+    written = []
+    for email, user in users.items():
+        path = user_file(email, PROFILE_FILE, create_dir=True)
+        with locked(path):
+            atomic_write_json(path, user)
+        written.append((email, user, path))
+    for email, user, path in written:
+        _remember(email, user, path)
+
+# ──────────────── Password Hashing ──────────────── #
+
+def _run_hash(fn, *args):
+    if not _hash_slots.acquire(timeout=HASH_WAIT_SECONDS):
+        raise AuthBusyError("Too many sign-ins in progress. Please try again in a moment.")
+    try:
+        return _hash_pool.submit(fn, *args).result()
+    finally:
+        _hash_slots.release()
+
+def _hash_password(password):
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode()
+
+def _check_password(password, hashed_pw):
+    return bcrypt.checkpw(password.encode(), hashed_pw.encode())
+
+def _hash_rounds(hashed_pw):
+    # bcrypt hashes look like $2b$12$<salt+hash>; the middle field is the cost.
+    try:
+        return int(hashed_pw.split("$")[2])
+    except (IndexError, ValueError):
+        return None
+
+def _rehash(email, password):
+    path = user_file(email, PROFILE_FILE)
+    version = file_version(path)
+    user = read_json(path) if version else None
+    if user and _hash_rounds(user["password"]) != BCRYPT_ROUNDS:
+        user = dict(user, password=_hash_password(password))
+        # Hashing takes a while; if another replica changed the profile meanwhile,
+        # keep its change and leave the upgrade to the next sign-in.
+        try:
+            write_json_if_unchanged(path, user, version)
+        except VersionConflict:
+            return
+        _remember(email, user, path)
 
 def register_user(email, password, name):
-    users = load_users()
-    if email in users:
+    if load_user(email):
+        return False
+    # Hash before touching the disk: a busy pool or a failed hash must not leave behind a
+    # shard directory that iter_users would then report as a user.
+    user = {"name": name, "password": _run_hash(_hash_password, password)}
+    path = user_file(email, PROFILE_FILE, create_dir=True)
+    # Two concurrent signups for the same email: only the first create wins (and the
+    # loser's shard directory is the winner's, so nothing is orphaned).
+    if not atomic_create_json(path, user):
         return False
-    hashed_pw = bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
-    users[email] = {"name": name, "password": hashed_pw}
-    save_users(users)
+    _remember(email, user, path)
     return True
 
 def authenticate_user(email, password):
-    users = load_users()
-    user = users.get(email)
-    if user and bcrypt.checkpw(password.encode(), user["password"].encode()):
-        return user["name"]
-    return None
+    user = load_user(email)
+    if not user or not _run_hash(_check_password, password, user["password"]):
+        return None
+    if _hash_rounds(user["password"]) != BCRYPT_ROUNDS:
+        # Upgrade to the configured cost in the background; the login doesn't wait for it.
+        _hash_pool.submit(_rehash, email, password)
+    return user["name"]
+
+# ──────────────── Session Tokens ──────────────── #
+
+def _get_session_secret():
+    global _session_secret
+    with _session_secret_lock:
+        if _session_secret is None:
+            secret = os.getenv("SMARTTRAVEL_SESSION_SECRET")
+            if secret:
+                _session_secret = secret.encode()
+            else:
+                if not os.path.exists(SESSION_SECRET_FILE):
+                    # Every replica sharing data/ must sign with the same key; first writer wins.
+                    os.makedirs(DATA_DIR, exist_ok=True)
+                    atomic_create_bytes(SESSION_SECRET_FILE, secrets.token_hex(32).encode())
+                with open(SESSION_SECRET_FILE, "rb") as f:
+                    _session_secret = f.read()
+        return _session_secret
+
+def _sign(payload):
+    return hmac.new(_get_session_secret(), payload.encode(), hashlib.sha256).hexdigest()
+
+def issue_session_token(email):
+    # Signs in the profile's session generation (revoke_sessions bumps it) and a random
+    # id that revoke_session_token can retire on its own.
+    user = load_user(email) or {}
+    encoded_email = base64.urlsafe_b64encode(email.encode()).decode()
+    payload = f"{encoded_email}.{user.get('session_generation', 0)}.{secrets.token_hex(8)}.{int(time.time()) + SESSION_TTL_SECONDS}"
+    return f"{payload}.{_sign(payload)}"
+
+def _parse_session_token(token):
+    # (email, generation, token id, expiry) for a correctly signed, unexpired token.
+    try:
+        encoded_email, generation, token_id, expires_at, signature = token.split(".")
+        payload = f"{encoded_email}.{generation}.{token_id}.{expires_at}"
+        if not hmac.compare_digest(signature, _sign(payload)) or int(expires_at) < time.time():
+            return None
+        return base64.urlsafe_b64decode(encoded_email.encode()).decode(), int(generation), token_id, int(expires_at)
+    except (ValueError, AttributeError):
+        return None
+
+def verify_session_token(token):
+    # Returns the email for a valid, unexpired, unrevoked token without touching bcrypt.
+    parsed = _parse_session_token(token)
+    if not parsed:
+        return None
+    email, generation, token_id, _ = parsed
+    user = load_user(email)
+    if not user or user.get("session_generation", 0) != generation or token_id in user.get("revoked_sessions", {}):
+        return None
+    return email
+
+def _update_profile(email, change):
+    path = user_file(email, PROFILE_FILE)
+    if not os.path.exists(path):
+        return
+    with locked(path):
+        user = read_json(path)
+        change(user)
+        atomic_write_json(path, user)
+    _remember(email, user, path)
+
+def revoke_session_token(token):
+    # Logout: retires this one token. Entries are dropped once the token has expired
+    # anyway, so the list stays short.
+    parsed = _parse_session_token(token)
+    if not parsed:
+        return
+    email, _, token_id, expires_at = parsed
+
+    def change(user):
+        now = time.time()
+        revoked = {key: until for key, until in user.get("revoked_sessions", {}).items() if until > now}
+        revoked[token_id] = expires_at
+        user["revoked_sessions"] = revoked
 
+    _update_profile(email, change)
 
+def revoke_sessions(email):
+    # "Log out everywhere": retires every token issued so far (on other replicas once
+    # their directory rechecks the profile, within USER_DIRECTORY_RECHECK_SECONDS).
+    def change(user):
+        user["session_generation"] = user.get("session_generation", 0) + 1
+        user.pop("revoked_sessions", None)
 
+    _update_profile(email, change)
@@ -0,0 +1,104 @@
+import hashlib
+import zlib
+from utils import metrics
+
+# Content-addressed, zlib-compressed text blobs inside a per-user SQLite database.
+# A blob may be stored as a delta against a base blob (the base's text is the zlib
+# preset dictionary), which is what makes regenerated, nearly identical itineraries
+# cheap. Bases are always stored whole, so reading never needs more than two rows.
+ZDICT_MAX_BYTES = 32 * 1024  # zlib only looks back this far into the dictionary
+COMPRESSION_LEVEL = 9
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS blobs (
+        hash TEXT PRIMARY KEY,
+        base TEXT,
+        size INTEGER NOT NULL,
+        data BLOB NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_blobs_base ON blobs (base);
+"""
+
+def content_hash(text):
+    return hashlib.sha256(text.encode()).hexdigest()
+
+def _compress(raw, zdict=None):
+    compressor = zlib.compressobj(COMPRESSION_LEVEL, zdict=zdict) if zdict else zlib.compressobj(COMPRESSION_LEVEL)
+    return compressor.compress(raw) + compressor.flush()
+
+def _decompress(data, zdict=None):
+    decompressor = zlib.decompressobj(zdict=zdict) if zdict else zlib.decompressobj()
+    return decompressor.decompress(data) + decompressor.flush()
+
+def _zdict(raw):
+    return raw[-ZDICT_MAX_BYTES:]
+
+def put(conn, text, base_hash=None):
+    # Stores text (a no-op if identical text is already stored) and returns its hash.
+    # base_hash names a similar blob to delta against; it is used only if that helps.
+    key = content_hash(text)
+    if conn.execute("SELECT 1 FROM blobs WHERE hash = ?", (key,)).fetchone():
+        return key
+    raw = text.encode()
+    data, base = _compress(raw), None
+    if base_hash and base_hash != key:
+        row = conn.execute("SELECT hash, base FROM blobs WHERE hash = ?", (base_hash,)).fetchone()
+        if row:
+            # Delta against the root of that blob, so chains never get deeper than one.
+            root = row[1] or row[0]
+            delta = _compress(raw, _zdict(get(conn, root).encode()))
+            if len(delta) < len(data):
+                data, base = delta, root
+    conn.execute("INSERT INTO blobs (hash, base, size, data) VALUES (?, ?, ?, ?)", (key, base, len(raw), data))
+    metrics.add("bytes_written", len(data))
+    return key
+
+def get_many(conn, hashes):
+    # {hash: text} for the given hashes; shared bases are read and inflated once.
+    wanted = list({h for h in hashes if h})
+    rows = {}
+    for start in range(0, len(wanted), 500):
+        chunk = wanted[start:start + 500]
+        placeholders = ", ".join("?" * len(chunk))
+        for row in conn.execute(f"SELECT hash, base, data FROM blobs WHERE hash IN ({placeholders})", chunk):
+            rows[row[0]] = row
+    missing_bases = {row[1] for row in rows.values() if row[1] and row[1] not in rows}
+    raw = {h: text.encode() for h, text in get_many(conn, missing_bases).items()} if missing_bases else {}
+    # Whole blobs first, so each base is inflated once however many deltas use it.
+    texts = {}
+    for key, base, data in sorted(rows.values(), key=lambda row: row[1] is not None):
+        metrics.add("bytes_read", len(data))
+        if base:
+            texts[key] = _decompress(data, _zdict(raw[base])).decode()
+        else:
+            raw[key] = _decompress(data)
+            texts[key] = raw[key].decode()
+    return texts
+
+def get(conn, key):
+    return get_many(conn, [key]).get(key)
+
+def release(conn, key, is_referenced):
+    # Drops one blob once nothing uses it (is_referenced(hash) says whether a record
+    # still does), then its base if that was the last delta on it. Index lookups only.
+    while key and not is_referenced(key):
+        if conn.execute("SELECT 1 FROM blobs WHERE base = ? LIMIT 1", (key,)).fetchone():
+            return
+        row = conn.execute("SELECT base FROM blobs WHERE hash = ?", (key,)).fetchone()
+        conn.execute("DELETE FROM blobs WHERE hash = ?", (key,))
+        key = row[0] if row else None
+
+def collect_garbage(conn, referenced_sql):
+    # Deletes blobs that neither referenced_sql (a SELECT of live hashes) nor another
+    # blob's base points at; a second pass frees bases whose last delta just went.
+    removed = 0
+    for _ in range(2):
+        removed += conn.execute(
+            f"DELETE FROM blobs WHERE hash NOT IN ({referenced_sql}) "
+            "AND hash NOT IN (SELECT base FROM blobs WHERE base IS NOT NULL)"
+        ).rowcount
+    return removed
+
+def stats(conn):
+    count, raw, stored = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(length(data)), 0) FROM blobs").fetchone()
+    return {"blobs": count, "raw_bytes": raw, "stored_bytes": stored}
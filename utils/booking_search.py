@@ -0,0 +1,79 @@
+from utils.gemini_client import ask_gemini_json, CACHE_TTL_LISTINGS
+from utils.listings import FLIGHT_SCHEMA, HOTEL_SCHEMA, parse_flights, parse_hotels
+
+PAGE_SIZE = 3
+MAX_PAGES = 5
+
+# Each prompt is built only from the normalized query and the listings already shown,
+# so a route/date (or city/date/budget) search is one entry in the shared response
+# cache: every user asking the same thing within CACHE_TTL_LISTINGS gets it for free,
+# and "load more" pages are cached the same way.
+
+def _place(name):
+    return " ".join(name.split()).title()
+
+def flight_query(from_city, to_city, departure_date, return_date):
+    return (_place(from_city), _place(to_city), str(departure_date), str(return_date))
+
+def hotel_query(city, checkin_date, nights, budget):
+    return (_place(city), str(checkin_date), int(nights), int(budget))
+
+# ──────────────── Prompts ──────────────── #
+
+def _flight_prompt(query, shown):
+    from_city, to_city, departure_date, return_date = query
+    prompt = f"""
+Generate {PAGE_SIZE} **fictional but realistic** flight options for a traveler going from {from_city} to {to_city}.
+
+Departure: {departure_date}
+Return: {return_date}
+The traveler wants affordable, common airline options for this route.
+
+You are NOT providing real-time flight data — just simulate **plausible examples** with realistic details.
+
+For each flight give the airline, flight number, departure and arrival times (24-hour HH:MM),
+duration in minutes, number of stops and the layover city if any, a hypothetical price in INR,
+and a few amenities (like meals, baggage, Wi-Fi).
+
+Do NOT include disclaimers or real booking links. Just {PAGE_SIZE} fictional listings.
+"""
+    if shown:
+        prompt += "These flights were already shown, so suggest different ones: " + ", ".join(
+            f"{flight.airline} {flight.flight_number}" for flight in shown
+        )
+    return prompt
+
+def _hotel_prompt(query, shown):
+    city, checkin_date, nights, budget = query
+    prompt = f"""
+Generate {PAGE_SIZE} **fictional but realistic** hotel listings in {city} for a {nights}-night stay starting on {checkin_date}. Budget: ₹{budget} per night.
+
+Each hotel should include its name, price per night in INR, star rating (1-5), amenities
+(e.g., Wi-Fi, AC, Breakfast), and distance in km from the city center or a named tourist spot.
+
+Do **NOT** add disclaimers, real-time accuracy warnings, or booking advice. This is for a mock booking UI only.
+"""
+    if shown:
+        prompt += "These hotels were already shown, so suggest different ones: " + ", ".join(hotel.name for hotel in shown)
+    return prompt
+
+# ──────────────── Search ──────────────── #
+
+def _unseen(listings, shown, identity):
+    # Drops repeats of earlier pages (and within this one); identities double as widget keys.
+    seen = {identity(listing) for listing in shown}
+    fresh = []
+    for listing in listings:
+        if identity(listing) not in seen:
+            seen.add(identity(listing))
+            fresh.append(listing)
+    return fresh
+
+def search_flights(query, shown=()):
+    # Returns the next page of flights for query, skipping any already in shown.
+    flights = parse_flights(ask_gemini_json(_flight_prompt(query, shown), FLIGHT_SCHEMA, cache_ttl=CACHE_TTL_LISTINGS))
+    return _unseen(flights, shown, lambda flight: (flight.airline, flight.flight_number))
+
+def search_hotels(query, shown=()):
+    hotels = parse_hotels(ask_gemini_json(_hotel_prompt(query, shown), HOTEL_SCHEMA, cache_ttl=CACHE_TTL_LISTINGS))
+    return _unseen(hotels, shown, lambda hotel: hotel.name)
@@ -0,0 +1,38 @@
+from functools import lru_cache
+from io import BytesIO
+
+CHART_CACHE_MAX_ENTRIES = 64
+
+def chart_key(totals_by_category):
+    # A hashable, order-independent key for the aggregate vector behind a chart.
+    return tuple(sorted((str(label), round(float(value), 2)) for label, value in totals_by_category.items()))
+
+@lru_cache(maxsize=CHART_CACHE_MAX_ENTRIES)
+def category_pie_png(key):
+    # matplotlib is only imported once a static chart is actually drawn. Figures are
+    # built outside pyplot so nothing lingers in its global figure registry.
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(6.4, 4.8))
+    FigureCanvasAgg(fig)
+    try:
+        ax = fig.subplots()
+        ax.pie([value for _, value in key], labels=[label for label, _ in key], autopct="%1.1f%%", startangle=90)
+        ax.axis("equal")
+        buffer = BytesIO()
+        fig.savefig(buffer, format="png", bbox_inches="tight")
+        return buffer.getvalue()
+    finally:
+        fig.clear()
+
+def category_pie_spec(key):
+    # Vega-Lite specs are cheap to build and the caller may mutate them, so they aren't cached.
+    return {
+        "data": {"values": [{"category": label, "amount": value} for label, value in key]},
+        "mark": {"type": "arc", "tooltip": True},
+        "encoding": {
+            "theta": {"field": "amount", "type": "quantitative", "stack": True},
+            "color": {"field": "category", "type": "nominal"},
+        },
+    }
@@ -1,63 +1,563 @@
 import json
 import os
-from datetime import datetime
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from utils import blob_store, metrics
+from utils.storage import DATA_DIR, SHARDS_DIR, user_file, iter_users, migrate_once, locked, read_json
 
-TRIPS_FILE = os.path.join("data", "trips.json")
-BOOKINGS_FILE = os.path.join("data", "bookings.json")
+TRIPS_FILE = os.path.join(DATA_DIR, "trips.json")
+LEGACY_TRIPS_DB_FILE = os.path.join(DATA_DIR, "trips.db")
+BOOKINGS_FILE = os.path.join(DATA_DIR, "bookings.json")
 
+TRIP_FIELDS = ["destination", "interests", "days", "start_date", "budget_per_day", "favorite", "itinerary"]
+SUMMARY_FIELDS = ["id", "destination", "interests", "days", "start_date", "budget_per_day", "favorite"]
+MAX_OPEN_CONNECTIONS_PER_THREAD = 16
+# WAL needs shared memory between the processes using a database, so replicas on
+# different nodes sharing a network volume should set this to DELETE.
+JOURNAL_MODE = os.getenv("SMARTTRAVEL_SQLITE_JOURNAL_MODE", "WAL")
+
+# Facet bands for the Planner's trip search: (label, low, high) with high exclusive, None open.
+DURATION_BANDS = [("1-3 days", 1, 4), ("4-7 days", 4, 8), ("8-14 days", 8, 15), ("15+ days", 15, None)]
+BUDGET_BANDS = [("Under ₹2,000", None, 2000), ("₹2,000-5,000", 2000, 5000), ("₹5,000-10,000", 5000, 10000), ("₹10,000+", 10000, None)]
+
+_local = threading.local()
+
+# ──────────────── Trip Store (per-user SQLite, WAL) ──────────────── #
+
+# Trip rows hold metadata and the hash of their itinerary; the text itself lives in
+# utils.blob_store, compressed and shared between identical itineraries.
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS trips (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        id TEXT NOT NULL,
+        destination TEXT NOT NULL,
+        interests TEXT,
+        days INTEGER,
+        start_date TEXT,
+        budget_per_day REAL,
+        favorite INTEGER NOT NULL DEFAULT 0,
+        itinerary_hash TEXT,
+        extra TEXT
+    );
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_trips_id ON trips (id);
+    CREATE INDEX IF NOT EXISTS idx_trips_start ON trips (start_date);
+    CREATE INDEX IF NOT EXISTS idx_trips_destination ON trips (destination);
+    CREATE INDEX IF NOT EXISTS idx_trips_itinerary ON trips (itinerary_hash);
+
+    CREATE TABLE IF NOT EXISTS bookings (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        type TEXT NOT NULL,
+        start_date TEXT,
+        end_date TEXT,
+        span_days INTEGER NOT NULL DEFAULT 0,
+        origin TEXT,
+        destination TEXT,
+        booked_on TEXT,
+        listing TEXT,
+        extra TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_bookings_dates ON bookings (start_date, end_date);
+    CREATE INDEX IF NOT EXISTS idx_bookings_type_start ON bookings (type, start_date);
+    CREATE INDEX IF NOT EXISTS idx_bookings_span ON bookings (span_days);
+
+    -- Contentless full-text index keyed by trips.seq; the text is compressed elsewhere,
+    -- so _index_trip feeds it. Facets are read from trips itself.
+    CREATE VIRTUAL TABLE IF NOT EXISTS trips_fts USING fts5(
+        destination, interests, itinerary,
+        content='', tokenize='porter unicode61 remove_diacritics 2', prefix='2 3'
+    );
+"""
+
+def _open(path):
+    conn = sqlite3.connect(path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    # Schema upgrades check, then alter; the lock keeps another process from doing
+    # the same upgrade in between.
+    with locked(path):
+        conn.execute(f"PRAGMA journal_mode={JOURNAL_MODE}")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(blob_store.SCHEMA)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(trips)")}
+        if "itinerary" in columns:
+            _move_itineraries_to_blobs(conn)
+        if columns and "id" not in columns:
+            _assign_trip_ids(conn)
+        indexed = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'trips_fts'").fetchone()
+        conn.executescript(SCHEMA)
+        if not indexed:
+            _reindex_trips(conn)
+        if conn.execute("PRAGMA user_version").fetchone()[0] < 1:
+            _unfill_booking_end_dates(conn)
+    return conn
+
+def _unfill_booking_end_dates(conn):
+    # Bookings saved without an end date (one-way flights) used to store their start
+    # date there. The booking pages always end after the start, so equal dates mean a
+    # missing one.
+    with _writing(conn):
+        conn.execute("UPDATE bookings SET end_date = NULL WHERE end_date = start_date")
+        conn.execute("PRAGMA user_version = 1")
+
+def _writing(conn):
+    # "with _writing(conn):" is "with conn:" that takes the write lock at BEGIN. The
+    # reads a write depends on (the row being updated, whether a blob exists) then
+    # can't go stale under another process, and a second writer waits out the busy
+    # timeout instead of failing when its deferred read lock can't be upgraded.
+    conn.execute("BEGIN IMMEDIATE")
+    return conn
+
+def _move_itineraries_to_blobs(conn):
+    # Older databases kept the itinerary inline (and indexed it through triggers).
+    with _writing(conn):
+        conn.execute("DROP TRIGGER IF EXISTS trips_fts_insert")
+        conn.execute("DROP TRIGGER IF EXISTS trips_fts_delete")
+        conn.execute("DROP TRIGGER IF EXISTS trips_fts_update")
+        conn.execute("DROP TABLE IF EXISTS trips_fts")
+        conn.execute("ALTER TABLE trips ADD COLUMN itinerary_hash TEXT")
+        latest = {}
+        for seq, destination, itinerary in conn.execute("SELECT seq, destination, itinerary FROM trips ORDER BY seq").fetchall():
+            if itinerary is not None:
+                latest[destination] = blob_store.put(conn, itinerary, latest.get(destination))
+                conn.execute("UPDATE trips SET itinerary_hash = ? WHERE seq = ?", (latest[destination], seq))
+        conn.execute("ALTER TABLE trips DROP COLUMN itinerary")
+    conn.execute("VACUUM")
+
+def _assign_trip_ids(conn):
+    # Trips saved before IDs existed get one each, in the order they were saved.
+    with _writing(conn):
+        conn.execute("ALTER TABLE trips ADD COLUMN id TEXT")
+        for (seq,) in conn.execute("SELECT seq FROM trips ORDER BY seq").fetchall():
+            conn.execute("UPDATE trips SET id = ? WHERE seq = ?", (new_trip_id(), seq))
+
+_CROCKFORD = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+def new_trip_id():
+    # A ULID: 48-bit millisecond timestamp then 80 random bits, as 26 Crockford base32
+    # characters, so IDs sort by creation time and never need coordination.
+    value = (int(time.time() * 1000) << 80) | int.from_bytes(os.urandom(10), "big")
+    return "".join(_CROCKFORD[(value >> shift) & 31] for shift in range(125, -1, -5))
+
+def _index_trip(conn, seq, trip):
+    conn.execute(
+        "INSERT INTO trips_fts (rowid, destination, interests, itinerary) VALUES (?, ?, ?, ?)",
+        (seq, trip.get("destination", ""), trip.get("interests"), trip.get("itinerary")),
+    )
+
+def _unindex_trip(conn, seq, trip):
+    # Contentless FTS5 forgets a row only when handed exactly the values it indexed.
+    conn.execute(
+        "INSERT INTO trips_fts (trips_fts, rowid, destination, interests, itinerary) VALUES ('delete', ?, ?, ?, ?)",
+        (seq, trip.get("destination", ""), trip.get("interests"), trip.get("itinerary")),
+    )
+
+def _reindex_trips(conn):
+    with _writing(conn):
+        conn.execute("INSERT INTO trips_fts (trips_fts) VALUES ('delete-all')")
+        rows = conn.execute("SELECT * FROM trips").fetchall()
+        for seq, trip in zip((row["seq"] for row in rows), _hydrate(conn, rows)):
+            _index_trip(conn, seq, trip)
+
+def _connect(user_email):
+    # Each user's trips live in their own database file, so writers for different
+    # users never contend for the same SQLite lock.
+    migrate_once("trips", _migrate_legacy_trips)
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = OrderedDict()
+    conn = conns.get(user_email)
+    if conn is not None:
+        conns.move_to_end(user_email)
+        return conn
+    conn = conns[user_email] = _open(user_file(user_email, "trips.db", create_dir=True))
+    while len(conns) > MAX_OPEN_CONNECTIONS_PER_THREAD:
+        conns.popitem(last=False)[1].close()
+    return conn
+
+def _row_to_trip(row, itinerary):
+    trip = {"id": row["id"]} if "id" in row.keys() else {}
+    trip.update({field: row[field] for field in TRIP_FIELDS if field != "itinerary"})
+    trip["itinerary"] = itinerary
+    trip["favorite"] = bool(trip["favorite"])
+    if row["extra"]:
+        trip.update(json.loads(row["extra"]))
+    return trip
+
+def _hydrate(conn, rows):
+    texts = blob_store.get_many(conn, [row["itinerary_hash"] for row in rows])
+    return [_row_to_trip(row, texts.get(row["itinerary_hash"])) for row in rows]
+
+def _put_itinerary(conn, destination, itinerary):
+    if itinerary is None:
+        return None
+    # The newest itinerary for the same destination is the likeliest near-copy.
+    previous = conn.execute(
+        "SELECT itinerary_hash FROM trips WHERE destination = ? AND itinerary_hash IS NOT NULL ORDER BY seq DESC LIMIT 1",
+        (destination,),
+    ).fetchone()
+    return blob_store.put(conn, itinerary, previous[0] if previous else None)
+
+def _release_itinerary(conn, itinerary_hash):
+    blob_store.release(
+        conn, itinerary_hash,
+        lambda key: conn.execute("SELECT 1 FROM trips WHERE itinerary_hash = ? LIMIT 1", (key,)).fetchone() is not None,
+    )
+
+def _insert_trip(conn, trip):
+    extra = {k: v for k, v in trip.items() if k not in TRIP_FIELDS and k != "id"}
+    trip_id = trip.get("id") or new_trip_id()
+    cursor = conn.execute(
+        "INSERT INTO trips (id, destination, interests, days, start_date, budget_per_day, favorite, itinerary_hash, extra) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            trip_id,
+            trip.get("destination", ""),
+            trip.get("interests"),
+            trip.get("days"),
+            trip.get("start_date"),
+            trip.get("budget_per_day"),
+            int(bool(trip.get("favorite", False))),
+            _put_itinerary(conn, trip.get("destination", ""), trip.get("itinerary")),
+            json.dumps(extra) if extra else None,
+        ),
+    )
+    _index_trip(conn, cursor.lastrowid, trip)
+    return trip_id
+
+def _import_trips(all_trips):
+    for user_email, trips in all_trips.items():
+        if not trips:
+            continue
+        conn = _open(user_file(user_email, "trips.db", create_dir=True))
+        with _writing(conn):
+            for trip in trips:
+                _insert_trip(conn, trip)
+        conn.close()
+
+def _migrate_legacy_trips():
+    # Legacy layouts: the shared trips.db, or before that the whole-file trips.json.
+    if os.path.exists(LEGACY_TRIPS_DB_FILE):
+        legacy = sqlite3.connect(LEGACY_TRIPS_DB_FILE)
+        legacy.row_factory = sqlite3.Row
+        all_trips = {}
+        for row in legacy.execute("SELECT * FROM trips ORDER BY seq"):
+            all_trips.setdefault(row["user_email"], []).append(_row_to_trip(row, row["itinerary"]))
+        legacy.close()
+        _import_trips(all_trips)
+    elif os.path.exists(TRIPS_FILE):
+        with open(TRIPS_FILE, "r") as f:
+            _import_trips(json.load(f))
+
+@metrics.timed("db.load_all_trips")
 def load_all_trips():
-    if not os.path.exists(TRIPS_FILE):
-        return {}
-    with open(TRIPS_FILE, "r") as f:
-        return json.load(f)
+    # Walks every shard; for maintenance tooling only, never on a page's hot path.
+    all_trips = {}
+    for user_email, path in iter_users():
+        if os.path.exists(os.path.join(path, "trips.db")):
+            all_trips[user_email] = load_trips(user_email)
+    return all_trips
+
+def _page(sql, params, offset, limit):
+    # SQLite needs a LIMIT before an OFFSET; -1 means no limit.
+    if limit is None and not offset:
+        return sql, params
+    return sql + " LIMIT ? OFFSET ?", [*params, -1 if limit is None else limit, offset]
 
-def load_trips(user_email):
-    all_trips = load_all_trips()
-    return all_trips.get(user_email, [])
+@metrics.timed("db.load_trips")
+def load_trips(user_email, offset=0, limit=None, newest_first=False):
+    conn = _connect(user_email)
+    sql, params = _page(f"SELECT * FROM trips ORDER BY seq{' DESC' if newest_first else ''}", [], offset, limit)
+    return _hydrate(conn, conn.execute(sql, params).fetchall())
 
+@metrics.timed("db.load_trip_summaries")
+def load_trip_summaries(user_email, offset=0, limit=None):
+    # Newest first, without the itinerary body; "id" fetches the rest with load_trip.
+    sql, params = _page(f"SELECT {', '.join(SUMMARY_FIELDS)} FROM trips ORDER BY seq DESC", [], offset, limit)
+    rows = _connect(user_email).execute(sql, params).fetchall()
+    return [dict(row, favorite=bool(row["favorite"])) for row in rows]
+
+@metrics.timed("db.trip_destinations")
+def trip_destinations(user_email):
+    # Distinct destinations, straight from the destination index.
+    rows = _connect(user_email).execute("SELECT DISTINCT destination FROM trips ORDER BY destination").fetchall()
+    return [row[0] for row in rows]
+
+@metrics.timed("db.load_trip")
+def load_trip(user_email, trip_id):
+    conn = _connect(user_email)
+    rows = conn.execute("SELECT * FROM trips WHERE id = ?", (trip_id,)).fetchall()
+    return _hydrate(conn, rows)[0] if rows else None
+
+@metrics.timed("db.save_trip")
 def save_trip(user_email, trip):
-    all_trips = load_all_trips()
-    if user_email not in all_trips:
-        all_trips[user_email] = []
-    all_trips[user_email].append(trip)
-    with open(TRIPS_FILE, "w") as f:
-        json.dump(all_trips, f, indent=2)
+    conn = _connect(user_email)
+    with _writing(conn):
+        return _insert_trip(conn, trip)
 
+@metrics.timed("db.clear_trips")
 def clear_trips(user_email):
-    all_trips = load_all_trips()
-    if user_email in all_trips:
-        all_trips[user_email] = []
-    with open(TRIPS_FILE, "w") as f:
-        json.dump(all_trips, f, indent=2)
-
-def mark_favorite(user_email, destination, favorite_status):
-    all_trips = load_all_trips()
-    trips = all_trips.get(user_email, [])
-    for trip in trips:
-        if trip["destination"] == destination:
-            trip["favorite"] = favorite_status
-    with open(TRIPS_FILE, "w") as f:
-        json.dump(all_trips, f, indent=2)
+    conn = _connect(user_email)
+    with _writing(conn):
+        conn.execute("DELETE FROM trips")
+        conn.execute("INSERT INTO trips_fts (trips_fts) VALUES ('delete-all')")
+        blob_store.collect_garbage(conn, "SELECT itinerary_hash FROM trips WHERE itinerary_hash IS NOT NULL")
 
-def save_booking(user, booking_data):
-    # Load existing bookings
-    if os.path.exists(BOOKINGS_FILE):
-        with open(BOOKINGS_FILE, "r") as f:
-            bookings = json.load(f)
+@metrics.timed("db.mark_favorite")
+def mark_favorite(user_email, trip_id, favorite_status):
+    # One keyed row write; the FTS index doesn't cover favorite, so it is untouched.
+    conn = _connect(user_email)
+    with _writing(conn):
+        conn.execute("UPDATE trips SET favorite = ? WHERE id = ?", (int(bool(favorite_status)), trip_id))
+
+@metrics.timed("db.delete_trip")
+def delete_trip(user_email, trip_id):
+    conn = _connect(user_email)
+    with _writing(conn):
+        rows = conn.execute("SELECT * FROM trips WHERE id = ?", (trip_id,)).fetchall()
+        if not rows:
+            return False
+        _unindex_trip(conn, rows[0]["seq"], _hydrate(conn, rows)[0])
+        conn.execute("DELETE FROM trips WHERE seq = ?", (rows[0]["seq"],))
+        _release_itinerary(conn, rows[0]["itinerary_hash"])
+    return True
+
+@metrics.timed("db.update_trip")
+def update_trip(user_email, trip_id, changes):
+    # Updates the given fields of one trip (itinerary included) and returns it, or None.
+    conn = _connect(user_email)
+    with _writing(conn):
+        rows = conn.execute("SELECT * FROM trips WHERE id = ?", (trip_id,)).fetchall()
+        if not rows:
+            return None
+        row, old = rows[0], _hydrate(conn, rows)[0]
+        new = {**old, **changes, "id": trip_id}
+        columns = {field: new.get(field) for field in TRIP_FIELDS if field != "itinerary"}
+        columns["favorite"] = int(bool(columns["favorite"]))
+        extra = {k: v for k, v in new.items() if k not in TRIP_FIELDS and k != "id"}
+        columns["extra"] = json.dumps(extra) if extra else None
+        if "itinerary" in changes and new["itinerary"] != old["itinerary"]:
+            columns["itinerary_hash"] = _put_itinerary(conn, new["destination"], new["itinerary"])
+        conn.execute(
+            f"UPDATE trips SET {', '.join(f'{column} = ?' for column in columns)} WHERE seq = ?",
+            [*columns.values(), row["seq"]],
+        )
+        if any(old.get(field) != new.get(field) for field in ("destination", "interests", "itinerary")):
+            _unindex_trip(conn, row["seq"], old)
+            _index_trip(conn, row["seq"], new)
+        if "itinerary_hash" in columns:
+            _release_itinerary(conn, row["itinerary_hash"])
+    return new
+
+@metrics.timed("db.trip_storage_stats")
+def trip_storage_stats(user_email):
+    return blob_store.stats(_connect(user_email))
+
+# ──────────────── Trip Search ──────────────── #
+
+def _match_query(text):
+    # Every word must match, each as a prefix so results narrow while the user types;
+    # quoting keeps FTS5 operators and punctuation in user input literal.
+    words = re.findall(r"\w+", text.lower())
+    return " ".join(f'"{word}"*' for word in words)
+
+def _band_sql(column, bands):
+    # Labels and bounds are bound as parameters, so a band label may hold any text.
+    cases, params = [], []
+    for label, low, high in bands:
+        conditions = []
+        for op, bound in ((">=", low), ("<", high)):
+            if bound is not None:
+                conditions.append(f"{column} {op} ?")
+                params.append(bound)
+        cases.append(f"WHEN {' AND '.join(conditions)} THEN ?")
+        params.append(label)
+    return f"CASE {' '.join(cases)} END", params
+
+# Each facet is an SQL expression and the parameters it binds.
+FACET_SQL = {
+    "favorite": ("favorite", []),
+    "duration": _band_sql("days", DURATION_BANDS),
+    "budget": _band_sql("budget_per_day", BUDGET_BANDS),
+    "month": ("substr(start_date, 1, 7)", []),
+}
+
+def _facet_clauses(facets, skip=None):
+    clauses, params = [], []
+    for name, value in (facets or {}).items():
+        if name != skip and value is not None:
+            expression, expression_params = FACET_SQL[name]
+            clauses.append(f"{expression} = ?")
+            params.extend(expression_params)
+            params.append(int(value) if name == "favorite" else value)
+    return clauses, params
+
+def _search_filter(text, facets, skip=None):
+    clauses, params = _facet_clauses(facets, skip)
+    match = _match_query(text or "")
+    if match:
+        clauses.insert(0, "seq IN (SELECT rowid FROM trips_fts WHERE trips_fts MATCH ?)")
+        params.insert(0, match)
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+@metrics.timed("db.count_trips")
+def count_trips(user_email, text="", facets=None):
+    # Total for load_trips, or for a search_trips query when text/facets are given.
+    where, params = _search_filter(text, facets)
+    return _connect(user_email).execute(f"SELECT COUNT(*) FROM trips{where}", params).fetchone()[0]
+
+@metrics.timed("db.search_trips")
+def search_trips(user_email, text="", facets=None, offset=0, limit=None):
+    # Ranked by relevance (destination hits weigh most) when there is text, else newest
+    # first. facets maps "favorite", "duration", "budget" or "month" to a trip_facets value.
+    clauses, params = _facet_clauses(facets)
+    match = _match_query(text or "")
+    if match:
+        sql = "SELECT trips.* FROM trips_fts JOIN trips ON trips.seq = trips_fts.rowid WHERE trips_fts MATCH ?"
+        params.insert(0, match)
+        order = " ORDER BY bm25(trips_fts, 10.0, 3.0, 1.0)"
     else:
-        bookings = {}
+        sql = "SELECT * FROM trips WHERE 1"
+        order = " ORDER BY seq DESC"
+    sql, params = _page(sql + "".join(f" AND {clause}" for clause in clauses) + order, params, offset, limit)
+    conn = _connect(user_email)
+    return _hydrate(conn, conn.execute(sql, params).fetchall())
 
-    if user not in bookings:
-        bookings[user] = []
+@metrics.timed("db.trip_facets")
+def trip_facets(user_email, text="", facets=None):
+    # {facet: {value: count}} over the trips matching text and the *other* selected
+    # facets, so each facet shows what choosing one of its values would return.
+    conn = _connect(user_email)
+    counts = {}
+    for name, (expression, expression_params) in FACET_SQL.items():
+        where, params = _search_filter(text, facets, skip=name)
+        rows = conn.execute(
+            f"SELECT {expression} AS value, COUNT(*) FROM trips{where} GROUP BY value ORDER BY value",
+            expression_params + params,
+        ).fetchall()
+        counts[name] = {row[0]: row[1] for row in rows if row[0] is not None}
+    return counts
 
-    booking_data["booked_on"] = datetime.now().strftime("%Y-%m-%d %H:%M")
-    bookings[user].append(booking_data)
+# ──────────────── Bookings (same per-user database) ──────────────── #
+
+# The pages' booking dicts name their dates and places per type; rows store them
+# under common columns so one index serves flights and hotels alike.
+BOOKING_COLUMNS = {
+    "flight": {"start_date": "departure_date", "end_date": "return_date", "origin": "from", "destination": "to"},
+    "hotel": {"start_date": "checkin_date", "end_date": "checkout_date", "origin": None, "destination": "destination"},
+}
+
+def _span_days(start, end):
+    try:
+        return max((date.fromisoformat(end) - date.fromisoformat(start)).days, 0)
+    except (TypeError, ValueError):
+        return 0
+
+def _insert_booking(conn, booking):
+    columns = BOOKING_COLUMNS.get(booking.get("type"), BOOKING_COLUMNS["hotel"])
+    known = {"id", "type", "booked_on", "listing", *filter(None, columns.values())}
+    values = {column: booking.get(key) if key else None for column, key in columns.items()}
+    extra = {k: v for k, v in booking.items() if k not in known}
+    cursor = conn.execute(
+        "INSERT INTO bookings (type, start_date, end_date, span_days, origin, destination, booked_on, listing, extra) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            booking.get("type", ""),
+            values["start_date"],
+            values["end_date"] or None,
+            _span_days(values["start_date"], values["end_date"]),
+            values["origin"],
+            values["destination"],
+            booking.get("booked_on"),
+            json.dumps(booking["listing"]) if booking.get("listing") is not None else None,
+            json.dumps(extra) if extra else None,
+        ),
+    )
+    return cursor.lastrowid
 
-    # Save back to file
-    with open(BOOKINGS_FILE, "w") as f:
-        json.dump(bookings, f, indent=4)
+def _row_to_booking(row):
+    booking = {"id": row["id"], "type": row["type"]}
+    for column, key in BOOKING_COLUMNS.get(row["type"], BOOKING_COLUMNS["hotel"]).items():
+        if key:
+            booking[key] = row[column]
+    if row["listing"]:
+        booking["listing"] = json.loads(row["listing"])
+    if row["extra"]:
+        booking.update(json.loads(row["extra"]))
+    booking["booked_on"] = row["booked_on"]
+    return booking
 
-    print("Booking saved:", booking_data)
+def _import_bookings(all_bookings):
+    for user, bookings in all_bookings.items():
+        if not bookings:
+            continue
+        conn = _open(user_file(user, "trips.db", create_dir=True))
+        with _writing(conn):
+            for booking in bookings:
+                _insert_booking(conn, booking)
+        conn.close()
 
+def _migrate_legacy_bookings():
+    # Legacy layouts: per-user bookings.json shards, or before that the shared bookings.json.
+    if os.path.exists(BOOKINGS_FILE) and not os.path.exists(os.path.join(SHARDS_DIR, ".bookings-migrated")):
+        _import_bookings(read_json(BOOKINGS_FILE, {}))
+    for user, path in iter_users():
+        shard_file = os.path.join(path, "bookings.json")
+        if os.path.exists(shard_file):
+            _import_bookings({user: read_json(shard_file, [])})
+            os.remove(shard_file)
 
+def _bookings_db(user):
+    migrate_once("bookings-db", _migrate_legacy_bookings)
+    return _connect(user)
+
+@metrics.timed("db.load_bookings")
+def load_bookings(user):
+    rows = _bookings_db(user).execute("SELECT * FROM bookings ORDER BY id").fetchall()
+    return [_row_to_booking(row) for row in rows]
+
+@metrics.timed("db.save_booking")
+def save_booking(user, booking_data):
+    booking_data["booked_on"] = datetime.now().strftime("%Y-%m-%d %H:%M")
+    conn = _bookings_db(user)
+    with _writing(conn):
+        booking_data["id"] = _insert_booking(conn, booking_data)
+    return booking_data["id"]
+
+@metrics.timed("db.upcoming_bookings")
+def upcoming_bookings(user, booking_type=None, today=None, limit=20):
+    # Soonest first, from today on; a range scan over (type, start_date) or start_date.
+    today = str(today or date.today())
+    if booking_type:
+        rows = _bookings_db(user).execute(
+            "SELECT * FROM bookings WHERE type = ? AND start_date >= ? ORDER BY start_date LIMIT ?",
+            (booking_type, today, limit),
+        ).fetchall()
+    else:
+        rows = _bookings_db(user).execute(
+            "SELECT * FROM bookings WHERE start_date >= ? ORDER BY start_date LIMIT ?", (today, limit)
+        ).fetchall()
+    return [_row_to_booking(row) for row in rows]
 
+@metrics.timed("db.bookings_between")
+def bookings_between(user, start, end, booking_type=None, limit=None):
+    # Bookings overlapping [start, end], earliest first. Nothing that starts before start
+    # minus the longest booking's span can reach into the range, which bounds the index
+    # scan; end_date is in the same index, so non-overlapping rows are never read.
+    # Bookings without an end date (one-way flights) cover their start date only.
+    conn = _bookings_db(user)
+    longest = conn.execute("SELECT MAX(span_days) FROM bookings").fetchone()[0] or 0
+    earliest = str(date.fromisoformat(str(start)) - timedelta(days=longest))
+    sql = "SELECT * FROM bookings WHERE start_date BETWEEN ? AND ? AND COALESCE(end_date, start_date) >= ?"
+    params = [earliest, str(end), str(start)]
+    if booking_type:
+        sql += " AND type = ?"
+        params.append(booking_type)
+    sql += " ORDER BY start_date"
+    if limit:
+        sql += " LIMIT ?"
+        params.append(limit)
+    rows = conn.execute(sql, params).fetchall()
+    return [_row_to_booking(row) for row in rows]
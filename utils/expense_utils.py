@@ -1,29 +1,154 @@
-import json
 import os
+import threading
+from collections import OrderedDict
+from utils import metrics
+from utils.storage import DATA_DIR, shard_dir, user_file, migrate_once, locked, file_version, atomic_write_bytes, atomic_write_json, read_json
 
-EXPENSES_FILE = os.path.join("data", "expenses.json")
+EXPENSES_FILE = os.path.join(DATA_DIR, "expenses.json")
+LEGACY_EXPENSES_DIR = os.path.join(DATA_DIR, "expenses")
 
-def load_all_expenses():
-    if not os.path.exists(EXPENSES_FILE):
-        return {}
-    with open(EXPENSES_FILE, "r") as f:
-        return json.load(f)
+CATEGORIES = ["Food", "Transport", "Accommodation", "Activities", "Misc"]
+COLUMNS = ["trip", "amount", "category", "notes", "date"]
+FRAME_CACHE_MAX_ENTRIES = 16
 
+# pandas (and pyarrow behind it) is imported inside the functions that build or read
+# frames, so importing this module - e.g. for the running totals - stays cheap.
+
+# Most recently used frames only, so memory stays bounded however many users visit.
+_frame_cache = OrderedDict()
+_frame_cache_lock = threading.Lock()
+
+# ──────────────── Storage Layout ──────────────── #
+
+def _rows_path(user_email, create_dir=False):
+    return user_file(user_email, "expenses.parquet", create_dir=create_dir)
+
+def _totals_path(user_email, create_dir=False):
+    return user_file(user_email, "expense_totals.json", create_dir=create_dir)
+
+def _frame_bytes(df):
+    return df.to_parquet(index=False)
+
+def _migrate_legacy_expenses():
+    # Legacy layouts: data/expenses/<key>.parquet, or before that the whole-file expenses.json.
+    # The per-file keys already match the shard keys, so those files move as they are.
+    if os.path.isdir(LEGACY_EXPENSES_DIR):
+        for name in os.listdir(LEGACY_EXPENSES_DIR):
+            key, _, suffix = name.partition(".")
+            target = {"parquet": "expenses.parquet", "totals.json": "expense_totals.json"}.get(suffix)
+            if target:
+                os.makedirs(shard_dir(key), exist_ok=True)
+                os.replace(os.path.join(LEGACY_EXPENSES_DIR, name), os.path.join(shard_dir(key), target))
+        return
+    for user_email, expenses in read_json(EXPENSES_FILE, {}).items():
+        if expenses:
+            df = _to_frame(expenses)
+            atomic_write_bytes(_rows_path(user_email, create_dir=True), _frame_bytes(df))
+            atomic_write_json(_totals_path(user_email), _totals_from_frame(df))
+
+# ──────────────── Columnar Rows ──────────────── #
+
+def _to_frame(expenses):
+    import pandas as pd
+
+    df = pd.DataFrame(expenses, columns=COLUMNS)
+    df["trip"] = df["trip"].astype("category")
+    df["amount"] = df["amount"].astype("float64")
+    df["category"] = pd.Categorical(df["category"], categories=CATEGORIES)
+    df["notes"] = df["notes"].fillna("").astype("string")
+    df["date"] = pd.to_datetime(df["date"])
+    return df
+
+@metrics.timed("expenses.load_expense_frame")
+def load_expense_frame(user_email):
+    migrate_once("expenses", _migrate_legacy_expenses)
+    path = _rows_path(user_email)
+    # Keyed on the file version, not just mtime: another process's write can land
+    # within the same mtime tick, and it always brings a new inode.
+    version = file_version(path)
+    if version is None:
+        return _to_frame([])
+    with _frame_cache_lock:
+        cached = _frame_cache.get(path)
+        if cached and cached[0] == version:
+            _frame_cache.move_to_end(path)
+            metrics.add("cache_hits")
+            return cached[1]
+    import pandas as pd
+
+    df = pd.read_parquet(path)
+    metrics.add("bytes_read", version[2])
+    with _frame_cache_lock:
+        _frame_cache[path] = (version, df)
+        _frame_cache.move_to_end(path)
+        while len(_frame_cache) > FRAME_CACHE_MAX_ENTRIES:
+            _frame_cache.popitem(last=False)
+    return df
+
+@metrics.timed("expenses.load_expenses")
 def load_expenses(user_email):
-    all_data = load_all_expenses()
-    return all_data.get(user_email, [])
+    df = load_expense_frame(user_email)
+    rows = df.astype({"trip": "object", "category": "object", "notes": "object"})
+    rows["date"] = rows["date"].dt.strftime("%Y-%m-%d")
+    return rows.to_dict("records")
+
+# ──────────────── Running Totals ──────────────── #
+
+def _empty_totals():
+    return {"count": 0, "total": 0.0, "by_trip": {}, "by_category": {}, "by_trip_category": {}}
+
+def _add_to_totals(totals, trip, category, amount):
+    totals["count"] += 1
+    totals["total"] = round(totals["total"] + amount, 2)
+    totals["by_trip"][trip] = round(totals["by_trip"].get(trip, 0.0) + amount, 2)
+    totals["by_category"][category] = round(totals["by_category"].get(category, 0.0) + amount, 2)
+    per_trip = totals["by_trip_category"].setdefault(trip, {})
+    per_trip[category] = round(per_trip.get(category, 0.0) + amount, 2)
+
+def _totals_from_frame(df):
+    totals = _empty_totals()
+    for row in df[["trip", "category", "amount"]].itertuples(index=False):
+        _add_to_totals(totals, str(row.trip), str(row.category), float(row.amount))
+    return totals
 
+@metrics.timed("expenses.load_expense_totals")
+def load_expense_totals(user_email):
+    migrate_once("expenses", _migrate_legacy_expenses)
+    return read_json(_totals_path(user_email)) or _empty_totals()
+
+@metrics.timed("expenses.category_totals")
+def category_totals(totals, trip=None, category=None):
+    if trip is None:
+        per_category = dict(totals["by_category"])
+    else:
+        per_category = dict(totals["by_trip_category"].get(trip, {}))
+    if category is not None:
+        per_category = {category: per_category.get(category, 0.0)}
+    return {cat: amount for cat, amount in per_category.items() if amount}
+
+# ──────────────── Writes ──────────────── #
+
+@metrics.timed("expenses.save_expense")
 def save_expense(user_email, expense):
-    all_data = load_all_expenses()
-    if user_email not in all_data:
-        all_data[user_email] = []
-    all_data[user_email].append(expense)
-    with open(EXPENSES_FILE, "w") as f:
-        json.dump(all_data, f, indent=2)
+    import pandas as pd
+
+    # The lock spans rows and totals: every replica's writer for this user queues here.
+    with locked(_rows_path(user_email, create_dir=True)):
+        df = load_expense_frame(user_email)
+        new_row = _to_frame([expense])
+        combined = pd.concat([df.astype({"trip": "object"}), new_row.astype({"trip": "object"})], ignore_index=True)
+        combined["trip"] = combined["trip"].astype("category")
+        atomic_write_bytes(_rows_path(user_email, create_dir=True), _frame_bytes(combined))
+
+        totals = load_expense_totals(user_email)
+        _add_to_totals(totals, expense["trip"], expense["category"], float(expense["amount"]))
+        atomic_write_json(_totals_path(user_email), totals)
 
+@metrics.timed("expenses.clear_expenses")
 def clear_expenses(user_email):
-    all_data = load_all_expenses()
-    if user_email in all_data:
-        all_data[user_email] = []
-    with open(EXPENSES_FILE, "w") as f:
-        json.dump(all_data, f, indent=2)
+    with locked(_rows_path(user_email, create_dir=True)):
+        for path in (_rows_path(user_email), _totals_path(user_email)):
+            if os.path.exists(path):
+                os.remove(path)
+        with _frame_cache_lock:
+            _frame_cache.pop(_rows_path(user_email), None)
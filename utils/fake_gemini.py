@@ -0,0 +1,188 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+# Offline stand-in for the Gemini model (SMARTTRAVEL_LLM_BACKEND=fake). Answers are
+# deterministic per prompt and shaped like what the pages parse; timings are tunable.
+FAKE_LATENCY_MS = float(os.getenv("SMARTTRAVEL_FAKE_LATENCY_MS", "0"))
+FAKE_JITTER = float(os.getenv("SMARTTRAVEL_FAKE_JITTER", "0.3"))
+FAKE_CHUNK_MS = float(os.getenv("SMARTTRAVEL_FAKE_CHUNK_MS", "0"))
+FAKE_SIZE_FACTOR = float(os.getenv("SMARTTRAVEL_FAKE_SIZE_FACTOR", "1"))
+CHUNK_SIZE = 200
+
+DESTINATIONS = [
+    "Goa", "Jaipur", "Kerala", "Manali", "Leh", "Udaipur", "Rishikesh", "Varanasi",
+    "Paris", "Rome", "Barcelona", "Tokyo", "Kyoto", "Bali", "Bangkok", "Singapore",
+    "Dubai", "Istanbul", "Prague", "Lisbon", "New York", "Cape Town", "Sydney", "Reykjavik",
+]
+AIRLINES = ["IndiGo", "Air India", "Vistara", "Emirates", "Qatar Airways", "Lufthansa", "Singapore Airlines"]
+HOTEL_WORDS = ["Grand", "Palace", "Residency", "Suites", "Inn", "Retreat", "Heritage", "Bay", "Plaza"]
+AMENITIES = ["Free Wi-Fi", "Breakfast included", "Pool", "AC", "Airport shuttle", "Spa", "Gym"]
+ACTIVITIES = [
+    "walk the old town", "visit the central market", "sunset at the viewpoint", "local cooking class",
+    "museum of history", "boat ride", "street food crawl", "temple visit", "day hike", "live music bar",
+]
+SEASONS = ["Summer", "Winter", "Monsoon", "Spring", "Autumn"]
+
+# ──────────────── Response Formats ──────────────── #
+
+def itinerary(r, days, activities_per_slot=1):
+    lines = []
+    for day in range(1, days + 1):
+        lines.append(f"### Day {day}")
+        for slot in ("Morning", "Afternoon", "Evening"):
+            picks = ", ".join(r.choice(ACTIVITIES) for _ in range(activities_per_slot))
+            lines.append(f"- **{slot}:** {picks} (approx. ₹{r.randrange(200, 4000, 50)})")
+        lines.append("")
+    return "\n".join(lines)
+
+def flight_record(r):
+    # Shaped like utils.listings.FLIGHT_SCHEMA.
+    departs = r.randrange(0, 24 * 60, 5)
+    duration = r.randrange(60, 16 * 60, 5)
+    arrives = (departs + duration) % (24 * 60)
+    stops = r.choice([0, 0, 1, 1, 2])
+    return {
+        "airline": r.choice(AIRLINES),
+        "flight_number": f"{r.choice('AEIKQSU')}{r.choice('IAKLQ')} {r.randint(100, 999)}",
+        "departure_time": f"{departs // 60:02d}:{departs % 60:02d}",
+        "arrival_time": f"{arrives // 60:02d}:{arrives % 60:02d}",
+        "duration_minutes": duration,
+        "stops": stops,
+        "via": r.choice(["Dubai", "Mumbai", "Doha", "Singapore"]) if stops else "",
+        "price_inr": r.randrange(3500, 85000, 100),
+        "amenities": r.sample(AMENITIES, 2),
+    }
+
+def hotel_record(r):
+    # Shaped like utils.listings.HOTEL_SCHEMA.
+    return {
+        "name": f"{r.choice(DESTINATIONS)} {r.choice(HOTEL_WORDS)} {r.choice(HOTEL_WORDS)}",
+        "price_per_night_inr": r.randrange(1200, 25000, 100),
+        "stars": r.randint(2, 5),
+        "amenities": r.sample(AMENITIES, 3),
+        "distance_km": round(r.uniform(0.2, 12), 1),
+        "landmark": "the city center",
+    }
+
+def flight_listing(r):
+    f = flight_record(r)
+    stops = f"{f['stops']} stop via {f['via']}" if f["stops"] else "Non-stop"
+    return (
+        f"**{f['airline']} ({f['flight_number']})**\n"
+        f"- Departure: {f['departure_time']} | Arrival: {f['arrival_time']}\n"
+        f"- Duration: {f['duration_minutes'] // 60}h {f['duration_minutes'] % 60}m\n"
+        f"- Stops: {stops}\n"
+        f"- Price: ₹{f['price_inr']:,}\n"
+        f"- Amenities: {', '.join(f['amenities'])}"
+    )
+
+def hotel_listing(r):
+    h = hotel_record(r)
+    return (
+        f"**{h['name']}**\n"
+        f"- Price per night: ₹{h['price_per_night_inr']:,}\n"
+        f"- Rating: {'★' * h['stars']}\n"
+        f"- Amenities: {', '.join(h['amenities'])}\n"
+        f"- {h['distance_km']} km from {h['landmark']}"
+    )
+
+def listings(r, kind, count=3, as_json=False):
+    if as_json:
+        make = flight_record if kind == "flight" else hotel_record
+        return json.dumps([make(r) for _ in range(count)])
+    make = flight_listing if kind == "flight" else hotel_listing
+    return "\n".join(make(r) for _ in range(count))
+
+def season(r):
+    return r.choice(SEASONS)
+
+def paragraphs(r, count):
+    return "\n\n".join(
+        " ".join(f"{r.choice(ACTIVITIES).capitalize()}." for _ in range(r.randint(3, 7)))
+        for _ in range(count)
+    )
+
+# ──────────────── Model ──────────────── #
+
+def _usage(prompt, text):
+    # Roughly four characters per token, like Gemini's English tokenization.
+    return SimpleNamespace(prompt_token_count=len(prompt) // 4 + 1, candidates_token_count=len(text) // 4 + 1)
+
+class FakeResponse:
+    def __init__(self, text, first_delay=0.0, chunk_delay=0.0, usage_metadata=None):
+        self.text = text
+        self.usage_metadata = usage_metadata
+        self._first_delay = first_delay
+        self._chunk_delay = chunk_delay
+
+    def __iter__(self):
+        # Streaming: wait for the "first token", then hand out fixed-size chunks; the
+        # last one carries the usage totals, as the real stream does.
+        if self._first_delay:
+            time.sleep(self._first_delay)
+        for start in range(0, len(self.text), CHUNK_SIZE):
+            if start and self._chunk_delay:
+                time.sleep(self._chunk_delay)
+            last = start + CHUNK_SIZE >= len(self.text)
+            yield FakeResponse(self.text[start:start + CHUNK_SIZE], usage_metadata=self.usage_metadata if last else None)
+
+class FakeModel:
+    """Drop-in for genai.GenerativeModel's generate_content / generate_content_async."""
+
+    def __init__(self, latency_ms=FAKE_LATENCY_MS, jitter=FAKE_JITTER, chunk_ms=FAKE_CHUNK_MS, size_factor=FAKE_SIZE_FACTOR, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter = jitter
+        self.chunk_ms = chunk_ms
+        self.size_factor = size_factor
+        self.calls = 0
+        self._timing = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def respond(self, prompt, as_json=False):
+        # Content is seeded by the prompt (same prompt, same answer); sizes follow a
+        # log-normal spread across prompts, scaled by size_factor.
+        r = random.Random(hashlib.sha256(prompt.encode()).hexdigest())
+        lowered = prompt.lower()
+        scale = max(1, round(r.lognormvariate(0, 0.4) * self.size_factor))
+        if "one word" in lowered and "season" in lowered:
+            text = season(r)
+        elif "flight" in lowered or "hotel" in lowered:
+            count = re.search(r"generate (\d+)", lowered)
+            kind = "flight" if "flight" in lowered else "hotel"
+            return listings(r, kind, int(count.group(1)) if count else 3, as_json=as_json)
+        else:
+            days = re.search(r"(\d+)[- ]day", lowered)
+            if days:
+                text = itinerary(r, min(int(days.group(1)), 30), activities_per_slot=scale)
+            else:
+                text = paragraphs(r, 3 * scale)
+        return json.dumps(text) if as_json else text
+
+    def _delays(self, text):
+        with self._lock:
+            self.calls += 1
+            spread = self._timing.uniform(1 - self.jitter, 1 + self.jitter)
+        chunks = max(1, -(-len(text) // CHUNK_SIZE))
+        return self.latency_ms * spread / 1000, self.chunk_ms / 1000, chunks
+
+    def generate_content(self, prompt, stream=False, generation_config=None, **kwargs):
+        as_json = (generation_config or {}).get("response_mime_type") == "application/json"
+        text = self.respond(prompt, as_json=as_json)
+        first, per_chunk, chunks = self._delays(text)
+        if stream:
+            return FakeResponse(text, first, per_chunk, _usage(prompt, text))
+        time.sleep(first + per_chunk * (chunks - 1))
+        return FakeResponse(text, usage_metadata=_usage(prompt, text))
+
+    async def generate_content_async(self, prompt, **kwargs):
+        text = self.respond(prompt)
+        first, per_chunk, chunks = self._delays(text)
+        await asyncio.sleep(first + per_chunk * (chunks - 1))
+        return FakeResponse(text, usage_metadata=_usage(prompt, text))
@@ -1,15 +1,216 @@
+import asyncio
+import json
 import os
-import google.generativeai as genai
+import queue
+import threading
+import time
 from dotenv import load_dotenv
+from utils import metrics
+from utils.response_cache import ResponseCache, cache_key
 
 load_dotenv()
 
 API_KEY = os.getenv("GEMINI_API_KEY")
+MODEL_NAME = "gemini-1.5-pro"
+MAX_CONCURRENT_REQUESTS = int(os.getenv("GEMINI_MAX_CONCURRENCY", "4"))
+SLOT_WAIT_SECONDS = float(os.getenv("GEMINI_SLOT_WAIT_SECONDS", "20"))
+LLM_BACKEND = os.getenv("SMARTTRAVEL_LLM_BACKEND", "gemini")
 
-genai.configure(api_key=API_KEY)
+# Freshness policies for pages that opt in to response caching (seconds).
+CACHE_TTL_SAFETY = 24 * 60 * 60
+CACHE_TTL_PACKING = 6 * 60 * 60
+CACHE_TTL_LISTINGS = 60 * 60
+CACHE_TTL_RECOMMENDATIONS = 10 * 60
 
-def ask_gemini(prompt: str) -> str:
-    model = genai.GenerativeModel("gemini-1.5-pro")
-    response = model.generate_content(prompt)
-    return response.text
+response_cache = ResponseCache()
 
+class GeminiBusyError(Exception):
+    pass
+
+_genai = None
+_genai_lock = threading.Lock()
+_model = None
+_model_lock = threading.Lock()
+# One limit for the whole process: sync streams and async batches take the same slots.
+_slots = threading.BoundedSemaphore(MAX_CONCURRENT_REQUESTS)
+_END = object()
+_loop = None
+_loop_lock = threading.Lock()
+
+def _sdk():
+    # The SDK drags in grpc and protobuf (about a second of import time), so it is
+    # imported and configured on the first model call rather than when a page loads.
+    global _genai
+    if _genai is None:
+        with _genai_lock:
+            if _genai is None:
+                import google.generativeai as genai
+                genai.configure(api_key=API_KEY)
+                _genai = genai
+    return _genai
+
+# ──────────────── Backends ──────────────── #
+
+def _gemini_model():
+    return _sdk().GenerativeModel(MODEL_NAME)
+
+def _fake_model():
+    from utils.fake_gemini import FakeModel
+    return FakeModel()
+
+# A backend is a factory for an object with GenerativeModel's generate_content(prompt,
+# stream=..., generation_config=...) and generate_content_async(prompt); the first is
+# what every page uses.
+_backends = {"gemini": _gemini_model, "fake": _fake_model}
+
+def register_backend(name, factory):
+    _backends[name] = factory
+
+def use_backend(name):
+    global LLM_BACKEND, _model
+    if name not in _backends:
+        raise ValueError(f"Unknown LLM backend: {name}")
+    with _model_lock:
+        LLM_BACKEND = name
+        _model = None
+
+def get_model():
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                if LLM_BACKEND not in _backends:
+                    raise ValueError(f"Unknown LLM backend: {LLM_BACKEND}")
+                _model = _backends[LLM_BACKEND]()
+    return _model
+
+def _lookup(prompt, cache_ttl, generation_config=None):
+    if not cache_ttl:
+        return None, None
+    # Stand-in answers must never be served to the real backend from the shared cache.
+    model_name = MODEL_NAME if LLM_BACKEND == "gemini" else f"{LLM_BACKEND}:{MODEL_NAME}"
+    if generation_config:
+        # The same prompt under a different response schema is a different answer.
+        model_name += json.dumps(generation_config, sort_keys=True)
+    key = cache_key(model_name, prompt)
+    return key, response_cache.get(key)
+
+# ──────────────── Sync API ──────────────── #
+
+def _token_counts(usage):
+    if usage is None:
+        return {}
+    return {"prompt_tokens": usage.prompt_token_count, "response_tokens": usage.candidates_token_count}
+
+def _json_config(schema):
+    return {"response_mime_type": "application/json", "response_schema": schema}
+
+def _acquire_slot():
+    if not _slots.acquire(timeout=SLOT_WAIT_SECONDS):
+        raise GeminiBusyError("SmartTravel AI is busy right now. Please try again in a moment.")
+
+def _pump(response, stream):
+    # Reads the model's stream on its own thread, so the slot covers the request only:
+    # not the page rendering each chunk, and not a generator abandoned by a rerun.
+    try:
+        for chunk in response:
+            stream.put(chunk)
+        stream.put(_END)
+    except Exception as e:
+        stream.put(e)
+    finally:
+        _slots.release()
+
+def ask_gemini_stream(prompt: str, cache_ttl: int = None, generation_config: dict = None):
+    # Timed by hand rather than with metrics.track: a span can't stay open across the
+    # yields, and the wall time here includes the page rendering each chunk.
+    start = time.perf_counter()
+    key, cached = _lookup(prompt, cache_ttl, generation_config)
+    if cached is not None:
+        metrics.observe("gemini.generate", time.perf_counter() - start, prompt_chars=len(prompt), response_chars=len(cached), cache_hits=1)
+        yield cached
+        return
+
+    chunks = []
+    usage = None
+    failed = False
+    try:
+        _acquire_slot()
+        try:
+            response = get_model().generate_content(prompt, stream=True, generation_config=generation_config)
+        except BaseException:
+            _slots.release()
+            raise
+        stream = queue.SimpleQueue()
+        threading.Thread(target=_pump, args=(response, stream), name="gemini-stream", daemon=True).start()
+        while (chunk := stream.get()) is not _END:
+            if isinstance(chunk, Exception):
+                raise chunk
+            usage = getattr(chunk, "usage_metadata", None) or usage
+            text = chunk.text
+            if text:
+                if not chunks:
+                    metrics.observe("gemini.first_chunk", time.perf_counter() - start)
+                chunks.append(text)
+                yield text
+    except Exception:
+        failed = True
+        raise
+    finally:
+        metrics.observe(
+            "gemini.generate", time.perf_counter() - start, failed=failed,
+            prompt_chars=len(prompt), response_chars=sum(map(len, chunks)), **_token_counts(usage),
+        )
+
+    # Only a fully received response is cached.
+    if key:
+        response_cache.set(key, "".join(chunks), cache_ttl)
+
+def ask_gemini(prompt: str, cache_ttl: int = None, generation_config: dict = None) -> str:
+    return "".join(ask_gemini_stream(prompt, cache_ttl=cache_ttl, generation_config=generation_config))
+
+def ask_gemini_json(prompt: str, schema: dict, cache_ttl: int = None) -> str:
+    # Constrains the answer to JSON matching schema; the caller parses it.
+    return ask_gemini(prompt, cache_ttl=cache_ttl, generation_config=_json_config(schema))
+
+# ──────────────── Async API ──────────────── #
+
+async def ask_gemini_async(prompt: str, cache_ttl: int = None) -> str:
+    with metrics.track("gemini.generate_async", prompt_chars=len(prompt)) as span:
+        key, cached = _lookup(prompt, cache_ttl)
+        if cached is not None:
+            span["fields"].update(response_chars=len(cached), cache_hits=1)
+            return cached
+
+        # Waiting for a slot blocks a worker thread, never the event loop.
+        await asyncio.to_thread(_acquire_slot)
+        try:
+            response = await get_model().generate_content_async(prompt)
+        finally:
+            _slots.release()
+        text = response.text
+        span["fields"].update(response_chars=len(text), **_token_counts(getattr(response, "usage_metadata", None)))
+
+        if key:
+            response_cache.set(key, text, cache_ttl)
+        return text
+
+async def gather_gemini_async(prompts, cache_ttl: int = None):
+    return await asyncio.gather(*(ask_gemini_async(prompt, cache_ttl=cache_ttl) for prompt in prompts))
+
+def _background_loop():
+    # The SDK's async transport binds to the loop it was first used on, so every
+    # sync caller shares one long-lived loop instead of calling asyncio.run().
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="gemini-async", daemon=True).start()
+    return _loop
+
+def run_async(coro):
+    return asyncio.run_coroutine_threadsafe(coro, _background_loop()).result()
+
+@metrics.timed("gemini.many")
+def ask_gemini_many(prompts, cache_ttl: int = None):
+    return run_async(gather_gemini_async(list(prompts), cache_ttl=cache_ttl))
@@ -0,0 +1,181 @@
+import json
+import re
+from dataclasses import asdict, dataclass, field
+
+# Response schemas (Gemini's OpenAPI subset) for the booking pages; the model fills them
+# in directly, so listings arrive as records instead of markdown to split apart.
+FLIGHT_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "airline": {"type": "string"},
+            "flight_number": {"type": "string"},
+            "departure_time": {"type": "string", "description": "24-hour HH:MM"},
+            "arrival_time": {"type": "string", "description": "24-hour HH:MM"},
+            "duration_minutes": {"type": "integer"},
+            "stops": {"type": "integer"},
+            "via": {"type": "string", "description": "Layover city, empty when non-stop"},
+            "price_inr": {"type": "integer"},
+            "amenities": {"type": "array", "items": {"type": "string"}},
+        },
+        "required": ["airline", "flight_number", "departure_time", "arrival_time", "duration_minutes", "stops", "price_inr"],
+    },
+}
+
+HOTEL_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "name": {"type": "string"},
+            "price_per_night_inr": {"type": "integer"},
+            "stars": {"type": "integer", "description": "1 to 5"},
+            "amenities": {"type": "array", "items": {"type": "string"}},
+            "distance_km": {"type": "number"},
+            "landmark": {"type": "string", "description": "What the distance is measured from"},
+        },
+        "required": ["name", "price_per_night_inr", "stars", "distance_km"],
+    },
+}
+
+# ──────────────── Coercion ──────────────── #
+
+def _int(value):
+    # Tolerates "₹12,500" or "12500.0" should the model stray from the schema's types.
+    if isinstance(value, (int, float)):
+        return int(value)
+    digits = re.sub(r"[^\d.]", "", str(value or ""))
+    return int(float(digits)) if digits else 0
+
+def _float(value):
+    if isinstance(value, (int, float)):
+        return float(value)
+    digits = re.sub(r"[^\d.]", "", str(value or ""))
+    return float(digits) if digits else 0.0
+
+def _clock(value):
+    # "9:05", "09:05" and "09:05 AM" all become "09:05", so times sort as strings.
+    match = re.search(r"(\d{1,2}):(\d{2})\s*([ap]m)?", str(value or ""), re.IGNORECASE)
+    if not match:
+        return ""
+    hour, minute = int(match.group(1)) % 24, int(match.group(2))
+    if match.group(3) and match.group(3).lower() == "pm" and hour < 12:
+        hour += 12
+    elif match.group(3) and match.group(3).lower() == "am" and hour == 12:
+        hour = 0
+    return f"{hour:02d}:{minute:02d}"
+
+def _strings(value):
+    if isinstance(value, str):
+        value = value.split(",")
+    return [str(item).strip() for item in value or [] if str(item).strip()]
+
+# ──────────────── Records ──────────────── #
+
+@dataclass(slots=True)
+class Flight:
+    airline: str
+    flight_number: str
+    departure_time: str
+    arrival_time: str
+    duration_minutes: int
+    stops: int
+    price_inr: int
+    via: str = ""
+    amenities: list = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            airline=str(data.get("airline", "")).strip(),
+            flight_number=str(data.get("flight_number", "")).strip(),
+            departure_time=_clock(data.get("departure_time")),
+            arrival_time=_clock(data.get("arrival_time")),
+            duration_minutes=_int(data.get("duration_minutes")),
+            stops=_int(data.get("stops")),
+            price_inr=_int(data.get("price_inr")),
+            via=str(data.get("via") or "").strip(),
+            amenities=_strings(data.get("amenities")),
+        )
+
+    def to_dict(self):
+        return asdict(self)
+
+    def to_markdown(self):
+        stops = "Non-stop" if not self.stops else f"{self.stops} stop{'s' if self.stops > 1 else ''}" + (f" via {self.via}" if self.via else "")
+        lines = [
+            f"**{self.airline} ({self.flight_number})**",
+            f"- Departure: {self.departure_time} | Arrival: {self.arrival_time}",
+            f"- Duration: {self.duration_minutes // 60}h {self.duration_minutes % 60}m",
+            f"- Stops: {stops}",
+            f"- Price: ₹{self.price_inr:,}",
+        ]
+        if self.amenities:
+            lines.append(f"- Amenities: {', '.join(self.amenities)}")
+        return "\n".join(lines)
+
+@dataclass(slots=True)
+class Hotel:
+    name: str
+    price_per_night_inr: int
+    stars: int
+    distance_km: float
+    landmark: str = "city center"
+    amenities: list = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            name=str(data.get("name", "")).strip(),
+            price_per_night_inr=_int(data.get("price_per_night_inr")),
+            stars=min(max(_int(data.get("stars")), 1), 5),
+            distance_km=round(_float(data.get("distance_km")), 1),
+            landmark=str(data.get("landmark") or "city center").strip(),
+            amenities=_strings(data.get("amenities")),
+        )
+
+    def to_dict(self):
+        return asdict(self)
+
+    def to_markdown(self):
+        lines = [
+            f"**{self.name}**",
+            f"- Price per night: ₹{self.price_per_night_inr:,}",
+            f"- Rating: {'★' * self.stars}",
+        ]
+        if self.amenities:
+            lines.append(f"- Amenities: {', '.join(self.amenities)}")
+        lines.append(f"- {self.distance_km} km from {self.landmark}")
+        return "\n".join(lines)
+
+# ──────────────── Parsing ──────────────── #
+
+def _records(text):
+    # Schema-constrained output is bare JSON; a fenced block is accepted too.
+    text = re.sub(r"^```(?:json)?\s*|\s*```$", "", text.strip())
+    data = json.loads(text)
+    if isinstance(data, dict):
+        data = next((value for value in data.values() if isinstance(value, list)), [data])
+    return [item for item in data if isinstance(item, dict)]
+
+def parse_flights(text):
+    flights = [Flight.from_dict(item) for item in _records(text)]
+    return [flight for flight in flights if flight.airline and flight.price_inr]
+
+def parse_hotels(text):
+    hotels = [Hotel.from_dict(item) for item in _records(text)]
+    return [hotel for hotel in hotels if hotel.name and hotel.price_per_night_inr]
+
+FLIGHT_SORTS = {
+    "Price": lambda flight: flight.price_inr,
+    "Departure": lambda flight: flight.departure_time,
+    "Duration": lambda flight: flight.duration_minutes,
+    "Stops": lambda flight: (flight.stops, flight.price_inr),
+}
+
+HOTEL_SORTS = {
+    "Price": lambda hotel: hotel.price_per_night_inr,
+    "Rating": lambda hotel: (-hotel.stars, hotel.price_per_night_inr),
+    "Distance": lambda hotel: hotel.distance_km,
+}
@@ -0,0 +1,183 @@
+import contextvars
+import functools
+import inspect
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRICS_WINDOW_SECONDS = int(os.getenv("SMARTTRAVEL_METRICS_WINDOW", str(15 * 60)))
+METRICS_MAX_SAMPLES = int(os.getenv("SMARTTRAVEL_METRICS_MAX_SAMPLES", "20000"))
+METRICS_PORT = int(os.getenv("SMARTTRAVEL_METRICS_PORT", "0"))
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Summed per (call, page); anything else a span collects is ignored by the exporters.
+FIELDS = ["prompt_chars", "response_chars", "prompt_tokens", "response_tokens", "cache_hits", "bytes_read", "bytes_written"]
+
+# Rolling window of (finished_at, call, page, seconds) for quantiles, plus lifetime totals.
+_samples = deque(maxlen=METRICS_MAX_SAMPLES)
+_totals = {}
+_lock = threading.Lock()
+# The innermost open span; a ContextVar so concurrent asyncio tasks don't share it.
+_current_span = contextvars.ContextVar("smarttravel_span", default=None)
+
+# ──────────────── Recording ──────────────── #
+
+def _current_page():
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+        ctx = get_script_run_ctx(suppress_warning=True)
+        page = ctx and ctx.pages_manager.get_pages().get(ctx.page_script_hash)
+        return page["page_name"] if page else "-"
+    except Exception:
+        return "-"
+
+def _record(call, page, seconds, fields, failed):
+    with _lock:
+        _samples.append((time.time(), call, page, seconds))
+        totals = _totals.get((call, page))
+        if totals is None:
+            totals = _totals[(call, page)] = dict.fromkeys(["calls", "errors", "seconds"] + FIELDS, 0)
+        totals["calls"] += 1
+        totals["errors"] += int(failed)
+        totals["seconds"] += seconds
+        for field in FIELDS:
+            totals[field] += fields.get(field, 0)
+
+@contextmanager
+def track(call, **fields):
+    # Times the block and attributes whatever add() reports inside it to this call.
+    parent = _current_span.get()
+    span = {"call": call, "page": parent["page"] if parent else _current_page(), "fields": dict(fields)}
+    token = _current_span.set(span)
+    start = time.perf_counter()
+    failed = False
+    try:
+        yield span
+    except Exception:
+        failed = True
+        raise
+    finally:
+        _current_span.reset(token)
+        _record(call, span["page"], time.perf_counter() - start, span["fields"], failed)
+
+def add(field, amount=1):
+    span = _current_span.get()
+    if span is not None and amount:
+        span["fields"][field] = span["fields"].get(field, 0) + amount
+
+def observe(call, seconds, failed=False, **fields):
+    # For code that can't hold a span open, e.g. generators that yield to the page mid-call.
+    parent = _current_span.get()
+    _record(call, parent["page"] if parent else _current_page(), seconds, fields, failed)
+
+def timed(call):
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with track(call):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with track(call):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+# ──────────────── Reporting ──────────────── #
+
+def _quantile(sorted_values, q):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+def _windowed():
+    cutoff = time.time() - METRICS_WINDOW_SECONDS
+    with _lock:
+        while _samples and _samples[0][0] < cutoff:
+            _samples.popleft()
+        recent = list(_samples)
+        totals = {key: dict(value) for key, value in _totals.items()}
+    by_key = {}
+    for _, call, page, seconds in recent:
+        by_key.setdefault((call, page), []).append(seconds)
+    return by_key, totals
+
+def snapshot():
+    # One row per (call, page): rolling-window latency quantiles plus lifetime totals.
+    by_key, totals = _windowed()
+    rows = []
+    for (call, page), total in totals.items():
+        recent = sorted(by_key.get((call, page), []))
+        row = {"call": call, "page": page, "recent_calls": len(recent)}
+        for q in QUANTILES:
+            row[f"p{round(q * 100)}_ms"] = round(_quantile(recent, q) * 1000, 2) if recent else None
+        row.update(calls=total["calls"], errors=total["errors"], total_seconds=round(total["seconds"], 3))
+        row.update({field: total[field] for field in FIELDS})
+        rows.append(row)
+    return sorted(rows, key=lambda row: row["p99_ms"] or 0, reverse=True)
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(call, page, **extra):
+    return ",".join(f'{key}="{_escape(value)}"' for key, value in {"call": call, "page": page, **extra}.items())
+
+def prometheus_text():
+    by_key, totals = _windowed()
+    lines = [
+        "# HELP smarttravel_call_seconds Call latency over the rolling window.",
+        "# TYPE smarttravel_call_seconds summary",
+    ]
+    for (call, page), total in sorted(totals.items()):
+        recent = sorted(by_key.get((call, page), []))
+        for q in QUANTILES:
+            if recent:
+                lines.append(f"smarttravel_call_seconds{{{_labels(call, page, quantile=q)}}} {_quantile(recent, q):.6f}")
+        lines.append(f"smarttravel_call_seconds_sum{{{_labels(call, page)}}} {total['seconds']:.6f}")
+        lines.append(f"smarttravel_call_seconds_count{{{_labels(call, page)}}} {total['calls']}")
+    for field in ["errors"] + FIELDS:
+        lines.append(f"# TYPE smarttravel_{field}_total counter")
+        for (call, page), total in sorted(totals.items()):
+            if total[field]:
+                lines.append(f"smarttravel_{field}_total{{{_labels(call, page)}}} {total[field]}")
+    return "\n".join(lines) + "\n"
+
+def reset():
+    with _lock:
+        _samples.clear()
+        _totals.clear()
+
+# ──────────────── HTTP Endpoint ──────────────── #
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") != "/metrics":
+            self.send_error(404)
+            return
+        body = prometheus_text().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_http_server(port):
+    # Serves /metrics for Prometheus next to the Streamlit server, in a daemon thread.
+    server = ThreadingHTTPServer(("0.0.0.0", port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+if METRICS_PORT:
+    try:
+        start_http_server(METRICS_PORT)
+    except OSError:
+        # Another process of this deployment already serves the port.
+        pass
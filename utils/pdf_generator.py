@@ -1,13 +1,53 @@
 from fpdf import FPDF
+from fpdf.fonts import SubsetMap
+from fontTools import ttLib
+from collections import OrderedDict
+from io import BytesIO
+import copy
+import hashlib
+import json
 import os
+import threading
+import zipfile
+from utils import metrics
+
+FONT_PATH = os.path.join(os.path.dirname(__file__), "DejaVuSans.ttf")
+PDF_CACHE_MAX_ENTRIES = 32
+
+_pdf_cache = OrderedDict()
+_pdf_cache_lock = threading.Lock()
+_font_pool = {}
+_font_pool_lock = threading.Lock()
+
+def _pooled_font(family, path):
+    # Parsing the TTF and building its width/glyph tables is the expensive part of
+    # add_font, so it happens once per process; documents get a copy of the result.
+    with _font_pool_lock:
+        if family not in _font_pool:
+            scratch = FPDF()
+            scratch.add_font(family, "", path)
+            with open(path, "rb") as f:
+                font_bytes = f.read()
+            _font_pool[family] = (scratch.fonts[family.lower()], font_bytes)
+        return _font_pool[family]
 
 class PDF(FPDF):
     def __init__(self):
         super().__init__()
-        font_path = os.path.join(os.path.dirname(__file__), "DejaVuSans.ttf")
-        self.add_font("DejaVu", "", font_path, uni=True)
+        self.add_pooled_font("DejaVu", FONT_PATH)
         self.set_font("DejaVu", size=14)
 
+    def add_pooled_font(self, family, path):
+        template, font_bytes = _pooled_font(family, path)
+        font = copy.copy(template)
+        font.i = len(self.fonts) + 1
+        # Subsetting at output time mutates the fontTools object and the used-glyph
+        # map, so those stay per document.
+        font.ttfont = ttLib.TTFont(BytesIO(font_bytes), recalcTimestamp=False, fontNumber=0, lazy=True)
+        font.missing_glyphs = []
+        font.subset = SubsetMap(font)
+        self.fonts[template.fontkey] = font
+
     def header(self):
         self.set_font("DejaVu", size=14)
         self.cell(0, 10, "Travel Itinerary", ln=True, align="C")
@@ -17,7 +57,8 @@ class PDF(FPDF):
         self.multi_cell(0, 8, body)
         self.ln()
 
-def generate_pdf(trip, filename):
+@metrics.timed("pdf.generate_pdf")
+def generate_pdf(trip):
     pdf = PDF()
     pdf.add_page()
 
@@ -31,10 +72,39 @@ def generate_pdf(trip, filename):
     )
 
     pdf.chapter_body(body)
-    pdf.output(filename)
-    return filename
+    data = bytes(pdf.output())
+    metrics.add("bytes_written", len(data))
+    return data
+
+def pdf_filename(trip):
+    return f"{trip['destination'].replace(' ', '_')}_itinerary.pdf"
 
+def trip_digest(trip):
+    return hashlib.sha256(json.dumps(trip, sort_keys=True, default=str).encode()).hexdigest()
 
+@metrics.timed("pdf.render_pdf_cached")
+def render_pdf_cached(trip):
+    # Rendered bytes are keyed on the trip's content, so edits (e.g. a new itinerary) miss the cache.
+    key = trip_digest(trip)
+    with _pdf_cache_lock:
+        if key in _pdf_cache:
+            _pdf_cache.move_to_end(key)
+            metrics.add("cache_hits")
+            return _pdf_cache[key]
 
+    data = generate_pdf(trip)
 
+    with _pdf_cache_lock:
+        _pdf_cache[key] = data
+        while len(_pdf_cache) > PDF_CACHE_MAX_ENTRIES:
+            _pdf_cache.popitem(last=False)
+    return data
 
+@metrics.timed("pdf.generate_pdf_zip")
+def generate_pdf_zip(trips):
+    buffer = BytesIO()
+    # Rendered directly: a batch of every trip would otherwise evict the per-trip downloads' cache.
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for i, trip in enumerate(trips, 1):
+            archive.writestr(f"{i:02d}_{pdf_filename(trip)}", generate_pdf(trip))
+    return buffer.getvalue()
@@ -0,0 +1,111 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from utils.storage import DATA_DIR
+
+CACHE_DB_FILE = os.path.join(DATA_DIR, "gemini_cache.db")
+MEMORY_MAX_ENTRIES = 256
+DISK_MAX_ENTRIES = 5000
+
+def normalize_prompt(prompt):
+    # Indentation and blank lines in the pages' triple-quoted prompts shouldn't split the cache.
+    return re.sub(r"\s+", " ", prompt).strip()
+
+def cache_key(model_name, prompt):
+    return hashlib.sha256(f"{model_name}\0{normalize_prompt(prompt)}".encode()).hexdigest()
+
+class ResponseCache:
+    """Two-tier (in-process LRU + SQLite) cache for model responses with per-entry TTLs."""
+
+    def __init__(self, db_path=CACHE_DB_FILE, memory_max=MEMORY_MAX_ENTRIES, disk_max=DISK_MAX_ENTRIES):
+        self.db_path = db_path
+        self.memory_max = memory_max
+        self.disk_max = disk_max
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+    def _db(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)")
+            self._local.conn = conn
+        return conn
+
+    def _remember(self, key, value, expires_at):
+        with self._lock:
+            self._memory[key] = (value, expires_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_max:
+                self._memory.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and entry[1] > now:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return entry[0]
+            if entry:
+                del self._memory[key]
+
+        conn = self._db()
+        row = conn.execute("SELECT value, expires_at FROM responses WHERE key = ?", (key,)).fetchone()
+        if row and row[1] > now:
+            with conn:
+                conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._remember(key, row[0], row[1])
+            with self._lock:
+                self.stats["disk_hits"] += 1
+            return row[0]
+
+        with self._lock:
+            self.stats["misses"] += 1
+        return None
+
+    def set(self, key, value, ttl):
+        now = time.time()
+        expires_at = now + ttl
+        self._remember(key, value, expires_at)
+        conn = self._db()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, now),
+            )
+            conn.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+            overflow = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.disk_max
+            if overflow > 0:
+                conn.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY accessed_at LIMIT ?)",
+                    (overflow,),
+                )
+                with self._lock:
+                    self.stats["evictions"] += overflow
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        conn = self._db()
+        with conn:
+            conn.execute("DELETE FROM responses")
@@ -0,0 +1,70 @@
+import csv
+import os
+from datetime import date
+from functools import lru_cache
+
+GAZETTEER_FILE = os.path.join(os.path.dirname(__file__), "gazetteer.csv")
+
+# Latitude bands: the tropics have a wet and a dry season (or, with no wet months listed,
+# one warm one), the polar regions a light and a dark one, and in between the usual four.
+TROPIC_LATITUDE = 23.5
+POLAR_LATITUDE = 66.5
+
+# Meteorological seasons for the northern hemisphere; the southern one is offset by six months.
+NORTHERN_SEASONS = {
+    12: "Winter", 1: "Winter", 2: "Winter",
+    3: "Spring", 4: "Spring", 5: "Spring",
+    6: "Summer", 7: "Summer", 8: "Summer",
+    9: "Autumn", 10: "Autumn", 11: "Autumn",
+}
+
+def normalize_destination(destination):
+    # "Kyoto, Japan" and " kyoto " resolve to the same gazetteer entry.
+    return destination.split(",")[0].strip().lower()
+
+def _parse_months(spec):
+    if not spec:
+        return None
+    start, end = (int(m) for m in spec.split("-"))
+    if start <= end:
+        return frozenset(range(start, end + 1))
+    return frozenset(list(range(start, 13)) + list(range(1, end + 1)))
+
+@lru_cache(maxsize=1)
+def load_gazetteer():
+    places = {}
+    with open(GAZETTEER_FILE, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            place = {
+                "name": row["name"],
+                "country": row["country"],
+                "lat": float(row["lat"]),
+                "wet_months": _parse_months(row["wet_months"]),
+            }
+            places[row["name"].lower()] = place
+            for alias in filter(None, row["aliases"].split("|")):
+                places.setdefault(alias.strip().lower(), place)
+    return places
+
+def season_for(lat, month, wet_months=None):
+    northern_month = (month + 5) % 12 + 1 if lat < 0 else month
+    if abs(lat) >= POLAR_LATITUDE:
+        return "Polar Summer" if 4 <= northern_month <= 9 else "Polar Winter"
+    # Listed wet months also count just outside the tropics, for monsoon climates like Dhaka's.
+    if wet_months:
+        return "Wet" if month in wet_months else "Dry"
+    if abs(lat) < TROPIC_LATITUDE:
+        return "Tropical"
+    return NORTHERN_SEASONS[northern_month]
+
+@lru_cache(maxsize=1024)
+def _resolve(key, month):
+    place = load_gazetteer().get(key)
+    if place is None:
+        return None
+    return season_for(place["lat"], month, place["wet_months"])
+
+def resolve_season(destination, when=None):
+    """Return the season at a known destination, or None if it isn't in the gazetteer."""
+    when = when or date.today()
+    return _resolve(normalize_destination(destination), when.month)
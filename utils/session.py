@@ -0,0 +1,49 @@
+import streamlit as st
+from utils.auth_utils import issue_session_token, verify_session_token, revoke_session_token, revoke_sessions
+
+# The signed session token lives only in st.session_state, never in the URL, where
+# history, copied links and Referer headers would leak it. Streamlit keeps a session
+# across websocket reconnects; a full reload starts a new one and asks for a login.
+# Every page calls check_session (or require_login), so an expired or revoked token
+# ends the session on its next render.
+
+def start_session(email, name):
+    st.session_state.update({
+        "authentication_status": True,
+        "username": email,
+        "name": name,
+        "session-token": issue_session_token(email),
+    })
+    # Links from before tokens left the URL may still carry one.
+    st.query_params.pop("session", None)
+
+def _clear_session():
+    st.session_state.update({"authentication_status": False, "username": None, "name": None})
+    st.session_state.pop("session-token", None)
+
+def end_session():
+    # Logout ends this session only; the user's other devices stay signed in.
+    if st.session_state.get("session-token"):
+        revoke_session_token(st.session_state["session-token"])
+    _clear_session()
+
+def end_all_sessions():
+    if st.session_state.get("username"):
+        revoke_sessions(st.session_state["username"])
+    _clear_session()
+
+def check_session():
+    # True while the session is signed in with a token that still verifies.
+    if not st.session_state.get("authentication_status"):
+        return False
+    token = st.session_state.get("session-token")
+    if token and verify_session_token(token) is None:
+        # Expired, or revoked by "log out everywhere": this session ends too.
+        _clear_session()
+        return False
+    return True
+
+def require_login():
+    if not check_session():
+        st.warning("Please log in from the home page to access this page.")
+        st.stop()
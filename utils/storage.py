@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+import threading
+import weakref
+from contextlib import contextmanager
+from utils import metrics
+
+try:
+    import fcntl
+except ImportError:  # Windows: locks below are then per process only
+    fcntl = None
+
+DATA_DIR = os.getenv("SMARTTRAVEL_DATA_DIR", "data")
+SHARDS_DIR = os.path.join(DATA_DIR, "shards")
+OWNER_FILE = "owner.json"
+
+_migrated = set()
+_migrate_lock = threading.Lock()
+# A lock lives only while some thread holds or waits on it, so one per user file
+# never accumulates.
+_path_locks = weakref.WeakValueDictionary()
+_path_locks_guard = threading.Lock()
+
+class VersionConflict(Exception):
+    pass
+
+# ──────────────── Per-User Shards ──────────────── #
+
+def user_key(user_email):
+    return hashlib.sha256(user_email.encode()).hexdigest()[:32]
+
+def shard_dir(key):
+    # data/shards/ab/ab12.../ keeps any one directory small even with millions of users.
+    return os.path.join(SHARDS_DIR, key[:2], key)
+
+def user_dir(user_email, create=False):
+    path = shard_dir(user_key(user_email))
+    if create:
+        owner_path = os.path.join(path, OWNER_FILE)
+        if not os.path.exists(owner_path):
+            os.makedirs(path, exist_ok=True)
+            # Shard names are hashes, so record whose data this is for maintenance scans.
+            atomic_write_json(owner_path, {"email": user_email})
+    return path
+
+def user_file(user_email, name, create_dir=False):
+    return os.path.join(user_dir(user_email, create=create_dir), name)
+
+def iter_users():
+    # Yields (email, shard directory) for every user; a full scan, so keep it off hot paths.
+    if not os.path.isdir(SHARDS_DIR):
+        return
+    for prefix in sorted(os.listdir(SHARDS_DIR)):
+        prefix_dir = os.path.join(SHARDS_DIR, prefix)
+        if not os.path.isdir(prefix_dir):
+            continue
+        for key in sorted(os.listdir(prefix_dir)):
+            path = os.path.join(prefix_dir, key)
+            owner = read_json(os.path.join(path, OWNER_FILE), {})
+            if owner.get("email"):
+                yield owner["email"], path
+
+# ──────────────── Atomic Files ──────────────── #
+
+def _tmp_path(path):
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+def _write_tmp(path, data):
+    tmp_path = _tmp_path(path)
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    return tmp_path
+
+def atomic_write_bytes(path, data):
+    # Readers see either the old file or the new one, never a partial write.
+    os.replace(_write_tmp(path, data), path)
+    metrics.add("bytes_written", len(data))
+
+def atomic_write_json(path, obj):
+    atomic_write_bytes(path, json.dumps(obj).encode())
+
+def atomic_create_bytes(path, data):
+    # Like atomic_write_bytes, but fails (returns False) if the file already exists.
+    tmp_path = _write_tmp(path, data)
+    try:
+        os.link(tmp_path, path)
+        metrics.add("bytes_written", len(data))
+        return True
+    except FileExistsError:
+        return False
+    finally:
+        os.remove(tmp_path)
+
+def atomic_create_json(path, obj):
+    return atomic_create_bytes(path, json.dumps(obj).encode())
+
+def file_version(path):
+    # Changes on every atomic write: os.replace always installs a new inode, so this
+    # holds even when two writes land within one mtime tick. None if there is no file.
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_ino, stat.st_size)
+
+def write_json_if_unchanged(path, obj, version):
+    # Optimistic write for values computed outside any lock (e.g. after a slow hash):
+    # raises VersionConflict instead of overwriting a change made since the read.
+    with locked(path):
+        if file_version(path) != version:
+            raise VersionConflict(path)
+        atomic_write_json(path, obj)
+
+def read_json(path, default=None):
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return default
+    metrics.add("bytes_read", len(data))
+    return json.loads(data)
+
+# ──────────────── Cross-Process Locks ──────────────── #
+
+def _path_lock(path):
+    with _path_locks_guard:
+        lock = _path_locks.get(path)
+        if lock is None:
+            lock = _path_locks[path] = threading.Lock()
+        return lock
+
+@contextmanager
+def locked(path):
+    # Exclusive access to path for read-modify-write, across threads (a per-path lock)
+    # and processes (a POSIX lock on path.lock, which NFS also honours, so replicas on
+    # other nodes sharing the data volume queue here too). The directory must exist.
+    with _path_lock(path):
+        if fcntl is None:
+            yield
+            return
+        with open(f"{path}.lock", "a+b") as f:
+            fcntl.lockf(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.lockf(f, fcntl.LOCK_UN)
+
+def migrate_once(name, migrate):
+    # Runs a legacy-layout import the first time any process sees the shard store;
+    # the marker's lock makes other processes wait for it rather than import twice.
+    if name in _migrated:
+        return
+    with _migrate_lock:
+        if name in _migrated:
+            return
+        marker = os.path.join(SHARDS_DIR, f".{name}-migrated")
+        if not os.path.exists(marker):
+            os.makedirs(SHARDS_DIR, exist_ok=True)
+            with locked(marker):
+                if not os.path.exists(marker):
+                    migrate()
+                    atomic_write_bytes(marker, b"")
+        _migrated.add(name)
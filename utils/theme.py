@@ -0,0 +1,45 @@
+import os
+import re
+from io import BytesIO
+import streamlit as st
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets")
+BASE_SHEET = "theme.css"
+HERO_QUALITY = 80
+
+# ──────────────── Stylesheets ──────────────── #
+
+def _minify(css):
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{}:;,>])\s*", r"\1", css)
+    return css.replace(";}", "}").strip()
+
+@st.cache_resource(show_spinner=False)
+def _stylesheet(sheets):
+    parts = []
+    for name in sheets:
+        with open(os.path.join(ASSETS_DIR, name), "r", encoding="utf-8") as f:
+            parts.append(f.read())
+    return f"<style>{_minify(''.join(parts))}</style>"
+
+def apply_theme(*extra_sheets):
+    # Streamlit drops any element a rerun doesn't emit again, so the <style> tag has
+    # to be re-sent each time; reading and minifying the sheets happens once per process.
+    st.markdown(_stylesheet((BASE_SHEET, *extra_sheets)), unsafe_allow_html=True)
+
+# ──────────────── Images ──────────────── #
+
+@st.cache_resource(show_spinner=False)
+def hero_image(path, max_width):
+    # Downscaled to the width it's shown at and re-encoded as WebP; st.image serves
+    # the bytes from the media cache instead of re-reading the original each rerun.
+    from PIL import Image
+
+    with Image.open(path) as img:
+        img = img.convert("RGBA" if "A" in img.getbands() else "RGB")
+        if img.width > max_width:
+            img = img.resize((max_width, round(img.height * max_width / img.width)), Image.LANCZOS)
+        buffer = BytesIO()
+        img.save(buffer, format="WEBP", quality=HERO_QUALITY, method=6)
+    return buffer.getvalue()